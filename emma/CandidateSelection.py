@@ -1,5 +1,6 @@
 import os
 import sys
+import multiprocessing
 from collections import defaultdict
 from typing import List
 from nltk.corpus import stopwords
@@ -10,6 +11,57 @@ import emma.utils.string_utils as string_utils
 import emma.constants as constants
 
 
+# tokenizer and stop words used by token map worker processes
+_worker_tokenizer = None
+_worker_stop = None
+
+
+def _init_token_map_worker(stop):
+    """
+    Initialize tokenizer and stop words once per worker process
+    :param stop: set of stop words
+    :return:
+    """
+    global _worker_tokenizer, _worker_stop
+    _worker_tokenizer = RegexpTokenizer(r'[A-Za-z\d]+')
+    _worker_stop = stop
+
+
+def _tokenize_entity(ent_payload, tokenizer, stop):
+    """
+    Tokenize all names and definition of an entity
+    :param ent_payload: tuple of (research_entity_id, aliases, definition)
+    :param tokenizer:
+    :param stop: set of stop words
+    :return: entity id, set of all tokens, list of alias character n-grams
+    """
+    ent_id, aliases, definition = ent_payload
+
+    # tokenize all names and definitions
+    name_tokens = []
+    char_tokens = []
+    for name in aliases:
+        name_tokens += string_utils.tokenize_string(name, tokenizer, stop)
+        char_tokens += string_utils.get_character_n_gram_strings(
+            string_utils.normalize_string(name), constants.NGRAM_SIZE
+        )
+
+    def_tokens = string_utils.tokenize_string(definition, tokenizer, stop)
+
+    # combine tokens
+    tokens = set(name_tokens).union(set(char_tokens)).union(set(def_tokens))
+    return ent_id, tokens, char_tokens
+
+
+def _tokenize_entity_worker(ent_payload):
+    """
+    Tokenize entity in a worker process initialized by _init_token_map_worker
+    :param ent_payload: tuple of (research_entity_id, aliases, definition)
+    :return:
+    """
+    return _tokenize_entity(ent_payload, _worker_tokenizer, _worker_stop)
+
+
 # class that generates match candidates for entities in a source kb from a target kb
 class CandidateSelection:
     def __init__(self, source_kb: KnowledgeBase, target_kb: KnowledgeBase):
@@ -37,6 +89,9 @@ class CandidateSelection:
         self.s_token_to_idf = dict()
         self.t_token_to_idf = dict()
 
+        # maps tokens passing the idf limit in both kbs to their target idf
+        self.t_token_weights = dict()
+
         self._build_map()
 
         self.EVAL_TOP_KS = [1, 2, 5, 10, 20, 50, 100, 200, 500]
@@ -46,7 +101,7 @@ class CandidateSelection:
     def _generate_token_map(self, ents: List[KBEntity]):
         """
         Generates token-to-entity and entity-to-token map for an input list
-        of KBEntity objects
+        of KBEntity objects; entities are tokenized in a process pool for large KBs
         :param ents: list of KBEntity objects
         :return: token-to-entity dict and entity-to-token dict
         """
@@ -56,25 +111,16 @@ class CandidateSelection:
         # maps token key to entities that have that token
         token_to_ents = defaultdict(set)
 
-        for ent in ents:
-            ent_id = ent.research_entity_id
-
-            # tokenize all names and definitions
-            name_tokens = []
-            char_tokens = []
-            for name in ent.aliases:
-                name_tokens += string_utils.tokenize_string(name, self.tokenizer, self.STOP)
-                char_tokens += [
-                    ''.join(c)
-                    for c in
-                    string_utils.get_character_n_grams(string_utils.normalize_string(name), constants.NGRAM_SIZE)
-                ]
-
-            def_tokens = string_utils.tokenize_string(ent.definition, self.tokenizer, self.STOP)
+        ent_payloads = [(ent.research_entity_id, ent.aliases, ent.definition) for ent in ents]
 
-            # combine tokens
-            tokens = set(name_tokens).union(set(char_tokens)).union(set(def_tokens))
+        if len(ent_payloads) >= constants.PARALLEL_TOKENIZE_MIN_ENTITIES and (os.cpu_count() or 1) > 1:
+            # multiprocessing.Pool rather than ProcessPoolExecutor, which only takes an initializer from python 3.7
+            with multiprocessing.Pool(initializer=_init_token_map_worker, initargs=(self.STOP,)) as pool:
+                ent_tokens = pool.map(_tokenize_entity_worker, ent_payloads, chunksize=256)
+        else:
+            ent_tokens = [_tokenize_entity(payload, self.tokenizer, self.STOP) for payload in ent_payloads]
 
+        for ent_id, tokens, char_tokens in ent_tokens:
             # add to ent-to-token map
             ent_to_tokens[ent_id] = tokens
 
@@ -125,6 +171,14 @@ class CandidateSelection:
             k: string_utils.get_idf(self.t_ent_num, len(self.t_token_to_ents[k]))
             for k in keep_tokens
         }
+
+        # apply the idf limits once here instead of on every candidate query
+        self.t_token_weights = {
+            k: self.t_token_to_idf[k]
+            for k in keep_tokens
+            if self.s_token_to_idf[k] >= constants.IDF_LIMIT
+            and self.t_token_to_idf[k] >= constants.IDF_LIMIT
+        }
         return
 
     def select_candidates(self, s_ent_id):
@@ -136,17 +190,14 @@ class CandidateSelection:
         s_tokens = self.s_ent_to_tokens.get(s_ent_id)
         t_ent_ids = defaultdict(float)
 
-        # get matches in t for each token in s_ent
+        # get matches in t for each token in s_ent shared by both KBs with IDF score over limit
         for token in s_tokens:
-            # check if token exists in both KBs and IDF score over limit
-            if self.s_token_to_ents.get(token) and self.t_token_to_ents.get(token) \
-                    and self.s_token_to_idf[token] >= constants.IDF_LIMIT \
-                    and self.t_token_to_idf[token] >= constants.IDF_LIMIT:
+            weight = self.t_token_weights.get(token)
+            if weight is not None:
                 for t_match in self.t_token_to_ents[token]:
-                    t_ent_ids[t_match] += self.t_token_to_idf[token]
+                    t_ent_ids[t_match] += weight
 
-        sorted_t = sorted(t_ent_ids, key=lambda k: t_ent_ids[k], reverse=True)
-        return sorted_t
+        return sorted(t_ent_ids, key=t_ent_ids.__getitem__, reverse=True)
 
     def eval(self, gold_mappings):
         """
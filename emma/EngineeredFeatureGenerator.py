@@ -1,16 +1,48 @@
+import sys
 import itertools
+from functools import lru_cache
+import numpy as np
 import spacy
 from nltk.corpus import stopwords
-from nltk.tokenize import RegexpTokenizer
-from nltk.stem.snowball import SnowballStemmer
 from nltk.stem.wordnet import WordNetLemmatizer
 
+# use the faster Rust implementations from vtext if available
+try:
+    from vtext.tokenize import RegexpTokenizer
+    from vtext.stem import SnowballStemmer
+    HAS_VTEXT = True
+except ImportError:
+    from nltk.tokenize import RegexpTokenizer
+    from nltk.stem.snowball import SnowballStemmer
+    HAS_VTEXT = False
+
 import emma.utils.string_utils as string_utils
+import emma.utils.numba_utils as numba_utils
 import emma.constants as constants
 
 
 # class for generating sparse features between entities of two KBs
 class EngineeredFeatureGenerator:
+    # entry sets compared by plain jaccard similarity, in feature order
+    JACCARD_SET_KEYS = (
+        'name_char_4grams', 'name_char_5grams', 'alias_token_set_frozenset', 'def_token_frozenset',
+        'wiki_entity_frozenset', 'mesh_synonym_frozenset', 'dbpedia_synonym_frozenset', 'all_synonym_frozenset'
+    )
+
+    # names of calculated features, in the order of feature matrix columns
+    FEATURE_NAMES = (
+        'has_same_canonical_name', 'has_same_canonical_name_tokens', 'has_same_canonical_name_token_set',
+        'has_same_stemmed_name_tokens', 'has_same_stemmed_name_token_set', 'has_same_lemmatized_name_tokens',
+        'has_same_lemmatized_name_token_set', 'name_char_4gram_jaccard', 'name_char_5gram_jaccard',
+        'has_alias_in_common', 'has_alias_tokens_in_common', 'has_alias_token_set_in_common',
+        'alias_token_jaccard', 'max_alias_token_jaccard', 'max_alias_4gram_jaccard', 'max_alias_5gram_jaccard',
+        'has_same_acronym', 'definition_token_jaccard', 'has_same_wiki_entity', 'wiki_entity_jaccard',
+        'max_wiki_entity_jaccard', 'has_same_mesh_synonym', 'mesh_synonym_jaccard', 'max_mesh_synonym_jaccard',
+        'has_same_dbpedia_synonym', 'dbpedia_synonym_jaccard', 'max_dbpedia_synonym_jaccard',
+        'has_overlapping_synonym', 'all_synonym_jaccard', 'max_all_synonym_jaccard', 'has_same_root_word',
+        'root_word_jaccard'
+    )
+
     def __init__(self, s_token_to_idf: dict = None, t_token_to_idf: dict = None):
         """
         Initializae feature generator; token to idf dicts are taken from the candidate selector
@@ -25,12 +57,24 @@ class EngineeredFeatureGenerator:
             self.idf_stop = set(s_tokens_to_void + t_tokens_to_void)
             self.STOP = self.STOP.union(self.idf_stop)
 
-        self.tokenizer = RegexpTokenizer(r'[A-Za-z\d]+')
-        self.stemmer = SnowballStemmer("english")
+        if HAS_VTEXT:
+            self.tokenizer = RegexpTokenizer(pattern=r'[A-Za-z\d]+')
+            self.stemmer = SnowballStemmer(lang="english")
+        else:
+            self.tokenizer = RegexpTokenizer(r'[A-Za-z\d]+')
+            self.stemmer = SnowballStemmer("english")
         self.lemmatizer = WordNetLemmatizer()
         self.nlp = spacy.load('en')
         self.token_dict = dict()
 
+        # int ids of tokens, used to pack token sets into arrays for the numba kernels
+        self.token_ids = dict()
+
+        # memoize per-string token processing; aliases and tokens recur across many entities
+        self._tokenize_cached = lru_cache(maxsize=constants.TOKEN_CACHE_SIZE)(self._tokenize_interned)
+        self._stem_cached = lru_cache(maxsize=constants.TOKEN_CACHE_SIZE)(self._stem_interned)
+        self._lemmatize_cached = lru_cache(maxsize=constants.TOKEN_CACHE_SIZE)(self._lemmatize_interned)
+
     def _dependency_parse(self, name):
         """
         compute dependency parse of name and return root word, and all chunk root words
@@ -43,13 +87,40 @@ class EngineeredFeatureGenerator:
         root_words = set([t for d, t in root_text])
         return root, root_words
 
+    def _tokenize_interned(self, s):
+        """
+        Tokenize string s, interning tokens so equal tokens share one string object
+        :param s:
+        :return:
+        """
+        return tuple(sys.intern(t) for t in string_utils.tokenize_string(s, self.tokenizer, self.STOP))
+
+    def _stem_interned(self, t):
+        """
+        Stem token t and intern the result
+        :param t:
+        :return:
+        """
+        # nltk lowercases before stemming, vtext does not
+        if HAS_VTEXT:
+            t = t.lower()
+        return sys.intern(self.stemmer.stem(t))
+
+    def _lemmatize_interned(self, t):
+        """
+        Lemmatize token t and intern the result
+        :param t:
+        :return:
+        """
+        return sys.intern(self.lemmatizer.lemmatize(t))
+
     def _tokenize(self, s):
         """
         Tokenize string s
         :param s:
         :return:
         """
-        return string_utils.tokenize_string(s, self.tokenizer, self.STOP)
+        return self._tokenize_cached(s)
 
     def _tokenize_list(self, l):
         """
@@ -71,12 +142,12 @@ class EngineeredFeatureGenerator:
     @staticmethod
     def _char_tokenize(s, ngram_size):
         """
-        Generate character n-grams over string s
+        Generate character n-grams over string s as interned strings
         :param s:
         :param ngram_size:
         :return:
         """
-        return string_utils.get_character_n_grams(s, ngram_size)
+        return tuple(sys.intern(c) for c in string_utils.get_character_n_gram_strings(s, ngram_size))
 
     def _char_tokenize_list(self, l, ngram_size):
         """
@@ -93,7 +164,7 @@ class EngineeredFeatureGenerator:
         :param t:
         :return:
         """
-        return [self.stemmer.stem(i) for i in t]
+        return [self._stem_cached(i) for i in t]
 
     def _lemmatize_tokens(self, t):
         """
@@ -101,7 +172,7 @@ class EngineeredFeatureGenerator:
         :param t:
         :return:
         """
-        return [self.lemmatizer.lemmatize(i) for i in t]
+        return [self._lemmatize_cached(i) for i in t]
 
     def _stem_list(self, l):
         """
@@ -136,26 +207,46 @@ class EngineeredFeatureGenerator:
         """
         return [self._acronym(t) for t in l]
 
+    def _set_list(self, l):
+        """
+        Return sets of each sublist in list l in the form expected by _max_jaccard: packed arrays of sorted
+        token ids if numba is available, otherwise a list of (frozenset, bit signature) pairs
+        :param l:
+        :return:
+        """
+        sets = [frozenset(i) for i in l]
+        if numba_utils.HAS_NUMBA:
+            return numba_utils.pack_sorted_sets(sets, self.token_ids)
+        return [(i, string_utils.get_token_signature(i)) for i in sets]
+
     @staticmethod
     def _jaccard(a, b):
         """
-        Return jaccard similarity between lists a and b
+        Return jaccard similarity between sets a and b
         :param a:
         :param b:
         :return:
         """
-        return string_utils.get_jaccard_similarity(set(a), set(b))
+        return string_utils.get_jaccard_similarity(a, b)
 
     def _max_jaccard(self, alist, blist):
         """
-        Returns max jaccard similarity between sublists in alist and blist
-        :param alist:
-        :param blist:
+        Returns max jaccard similarity between sets in alist and blist
+        :param alist: sets as returned by _set_list
+        :param blist: sets as returned by _set_list
         :return:
         """
+        if numba_utils.HAS_NUMBA:
+            return numba_utils.max_sorted_jaccard(alist[0], alist[1], blist[0], blist[1])
+
         max_jacc = 0.0
-        for a, b in itertools.product(alist, blist):
-            jacc = self._jaccard(a, b)
+        for (a, a_sig), (b, b_sig) in itertools.product(alist, blist):
+            # sets with disjoint signatures share no tokens and cannot raise the max
+            if not a_sig & b_sig:
+                continue
+            # both sets are non-empty here, so compute jaccard inline
+            intersection_size = len(a & b)
+            jacc = intersection_size / (len(a) + len(b) - intersection_size)
             if jacc == 1.0:
                 return 1.0
             if jacc > max_jacc:
@@ -170,7 +261,7 @@ class EngineeredFeatureGenerator:
         :param b:
         :return:
         """
-        return not set(a).isdisjoint(b)
+        return not a.isdisjoint(b)
 
     def _form_dict_entry(self, ent):
         """
@@ -182,11 +273,11 @@ class EngineeredFeatureGenerator:
         dict_entry['name_tokens'] = self._tokenize(ent['canonical_name'])
         dict_entry['stemmed_name_tokens'] = self._stem_tokens(dict_entry['name_tokens'])
         dict_entry['lemmatized_name_tokens'] = self._lemmatize_tokens(dict_entry['name_tokens'])
-        dict_entry['name_char_4grams'] = self._char_tokenize(ent['canonical_name'], 4)
-        dict_entry['name_char_5grams'] = self._char_tokenize(ent['canonical_name'], 5)
+        dict_entry['name_char_4grams'] = frozenset(self._char_tokenize(ent['canonical_name'], 4))
+        dict_entry['name_char_5grams'] = frozenset(self._char_tokenize(ent['canonical_name'], 5))
         dict_entry['alias_tokens'] = self._tokenize_list(ent['aliases'])
-        dict_entry['alias_char_4grams'] = self._char_tokenize_list(ent['aliases'], 4)
-        dict_entry['alias_char_5grams'] = self._char_tokenize_list(ent['aliases'], 5)
+        dict_entry['alias_char_4grams'] = self._set_list(self._char_tokenize_list(ent['aliases'], 4))
+        dict_entry['alias_char_5grams'] = self._set_list(self._char_tokenize_list(ent['aliases'], 5))
         dict_entry['acronyms'] = self._acronym_list(dict_entry['alias_tokens'])
         dict_entry['alias_token_set'] = self._order_sublists(dict_entry['alias_tokens'])
         dict_entry['def_tokens'] = self._tokenize(ent['definition'])
@@ -194,6 +285,35 @@ class EngineeredFeatureGenerator:
         dict_entry['mesh_syn_tokens'] = self._tokenize_list(ent['mesh_synonyms'])
         dict_entry['dbpedia_syn_tokens'] = self._tokenize_list(ent['dbpedia_synonyms'])
         dict_entry['parse_root'] = self._dependency_parse(ent['canonical_name'])
+
+        # sets computed once per entity and reused across all pairs the entity appears in
+        dict_entry['name_token_frozenset'] = frozenset(dict_entry['name_tokens'])
+        dict_entry['stemmed_name_token_frozenset'] = frozenset(dict_entry['stemmed_name_tokens'])
+        dict_entry['lemmatized_name_token_frozenset'] = frozenset(dict_entry['lemmatized_name_tokens'])
+        dict_entry['alias_frozenset'] = frozenset(ent['aliases'])
+        dict_entry['alias_tokens_frozenset'] = frozenset(dict_entry['alias_tokens'])
+        dict_entry['alias_token_set_frozenset'] = frozenset(dict_entry['alias_token_set'])
+        dict_entry['alias_token_sets'] = self._set_list(dict_entry['alias_token_set'])
+        dict_entry['acronym_frozenset'] = frozenset(dict_entry['acronyms'])
+        dict_entry['def_token_frozenset'] = frozenset(dict_entry['def_tokens'])
+        dict_entry['wiki_entity_frozenset'] = frozenset(ent['wiki_entities'])
+        dict_entry['wiki_ent_token_sets'] = self._set_list(dict_entry['wiki_ent_tokens'])
+        dict_entry['mesh_synonym_frozenset'] = frozenset(ent['mesh_synonyms'])
+        dict_entry['mesh_syn_token_sets'] = self._set_list(dict_entry['mesh_syn_tokens'])
+        dict_entry['dbpedia_synonym_frozenset'] = frozenset(ent['dbpedia_synonyms'])
+        dict_entry['dbpedia_syn_token_sets'] = self._set_list(dict_entry['dbpedia_syn_tokens'])
+        dict_entry['all_synonym_frozenset'] = dict_entry['alias_frozenset'] | dict_entry['wiki_entity_frozenset'] | \
+                                          dict_entry['mesh_synonym_frozenset'] | dict_entry['dbpedia_synonym_frozenset']
+        dict_entry['all_synonym_token_sets'] = self._set_list(
+            dict_entry['alias_token_set'] + dict_entry['wiki_ent_tokens'] +
+            dict_entry['mesh_syn_tokens'] + dict_entry['dbpedia_syn_tokens']
+        )
+        if numba_utils.HAS_NUMBA:
+            # pack sets compared by jaccard so each pair needs a single kernel call
+            dict_entry['jaccard_sets'] = numba_utils.pack_sorted_sets(
+                [dict_entry[k] for k in self.JACCARD_SET_KEYS] + [dict_entry['parse_root'][1]],
+                self.token_ids
+            )
         return dict_entry
 
     def _get_dict_entry(self, ent):
@@ -228,7 +348,30 @@ class EngineeredFeatureGenerator:
         Calculate features between two entities s_ent and t_ent from source and target KBs respectively
         :param s_ent: entity from source KB
         :param t_ent: entity from target KB
-        :return:
+        :return: dict of feature name to value
+        """
+        return dict(zip(self.FEATURE_NAMES, self._calculate_feature_values(s_ent, t_ent)))
+
+    def calculate_features_batch(self, pairs, out=None):
+        """
+        Calculate features for entity pairs into the rows of a feature matrix
+        :param pairs: iterable of (source entity, target entity)
+        :param out: optional preallocated array of shape (len(pairs), len(FEATURE_NAMES)) to fill
+        :return: feature matrix with columns in FEATURE_NAMES order
+        """
+        if out is None:
+            pairs = list(pairs)
+            out = np.empty((len(pairs), len(self.FEATURE_NAMES)), dtype=np.float64)
+        for i, (s_ent, t_ent) in enumerate(pairs):
+            out[i] = self._calculate_feature_values(s_ent, t_ent)
+        return out
+
+    def _calculate_feature_values(self, s_ent: dict, t_ent: dict):
+        """
+        Calculate feature values between two entities s_ent and t_ent
+        :param s_ent: entity from source KB
+        :param t_ent: entity from target KB
+        :return: tuple of feature values in FEATURE_NAMES order
         """
         # validate entities have all necessary fields
         s_ent = self._validate_entity(s_ent)
@@ -240,102 +383,69 @@ class EngineeredFeatureGenerator:
             s_info = self._get_dict_entry(s_ent)
             t_info = self._get_dict_entry(t_ent)
 
+            if numba_utils.HAS_NUMBA:
+                s_data, s_offsets = s_info['jaccard_sets']
+                t_data, t_offsets = t_info['jaccard_sets']
+                jaccards = numba_utils.paired_sorted_jaccard(s_data, s_offsets, t_data, t_offsets).tolist()
+            else:
+                jaccards = [self._jaccard(s_info[k], t_info[k]) for k in self.JACCARD_SET_KEYS]
+                jaccards.append(self._jaccard(s_info['parse_root'][1], t_info['parse_root'][1]))
+            (name_char_4gram_jaccard, name_char_5gram_jaccard, alias_token_jaccard, definition_token_jaccard,
+             wiki_entity_jaccard, mesh_synonym_jaccard, dbpedia_synonym_jaccard, all_synonym_jaccard,
+             root_word_jaccard) = jaccards
+
             has_same_canonical_name = (s_ent['canonical_name'] == t_ent['canonical_name'])
             has_same_canonical_name_tokens = (s_info['name_tokens'] == t_info['name_tokens'])
-            has_same_canonical_name_token_set = (set(s_info['name_tokens']) == set(t_info['name_tokens']))
+            has_same_canonical_name_token_set = (s_info['name_token_frozenset'] == t_info['name_token_frozenset'])
             has_same_stemmed_name_tokens = (s_info['stemmed_name_tokens'] == t_info['stemmed_name_tokens'])
-            has_same_stemmed_name_token_set = (set(s_info['stemmed_name_tokens']) == set(t_info['stemmed_name_tokens']))
+            has_same_stemmed_name_token_set = (s_info['stemmed_name_token_frozenset'] ==
+                                               t_info['stemmed_name_token_frozenset'])
             has_same_lemmatized_name_tokens = (s_info['lemmatized_name_tokens'] == t_info['lemmatized_name_tokens'])
-            has_same_lemmatized_name_token_set = (set(s_info['lemmatized_name_tokens']) == set(t_info['lemmatized_name_tokens']))
+            has_same_lemmatized_name_token_set = (s_info['lemmatized_name_token_frozenset'] ==
+                                                  t_info['lemmatized_name_token_frozenset'])
 
-            name_char_4gram_jaccard = self._jaccard(s_info['name_char_4grams'], t_info['name_char_4grams'])
-            name_char_5gram_jaccard = self._jaccard(s_info['name_char_5grams'], t_info['name_char_5grams'])
+            has_alias_in_common = self._overlaps(s_info['alias_frozenset'], t_info['alias_frozenset'])
+            has_alias_tokens_in_common = self._overlaps(s_info['alias_tokens_frozenset'],
+                                                        t_info['alias_tokens_frozenset'])
+            has_alias_token_set_in_common = self._overlaps(s_info['alias_token_set_frozenset'],
+                                                           t_info['alias_token_set_frozenset'])
 
-            has_alias_in_common = self._overlaps(s_ent['aliases'], t_ent['aliases'])
-            has_alias_tokens_in_common = self._overlaps(s_info['alias_tokens'], t_info['alias_tokens'])
-            has_alias_token_set_in_common = self._overlaps(s_info['alias_token_set'], t_info['alias_token_set'])
-
-            alias_token_jaccard = self._jaccard(s_info['alias_token_set'], t_info['alias_token_set'])
-            max_alias_token_jaccard = self._max_jaccard(s_info['alias_token_set'], t_info['alias_token_set'])
+            max_alias_token_jaccard = self._max_jaccard(s_info['alias_token_sets'], t_info['alias_token_sets'])
             max_alias_4gram_jaccard = self._max_jaccard(s_info['alias_char_4grams'], t_info['alias_char_4grams'])
             max_alias_5gram_jaccard = self._max_jaccard(s_info['alias_char_5grams'], t_info['alias_char_5grams'])
 
-            has_same_acronym = self._overlaps(s_info['acronyms'], t_info['acronyms']) or \
-                               self._overlaps(s_info['acronyms'], t_ent['aliases']) or \
-                               self._overlaps(s_ent['aliases'], t_info['acronyms'])
-
-            definition_token_jaccard = self._jaccard(s_info['def_tokens'], t_info['def_tokens'])
-
-            has_same_wiki_entity = self._overlaps(s_ent['wiki_entities'], t_ent['wiki_entities'])
-            wiki_entity_jaccard = self._jaccard(s_ent['wiki_entities'], t_ent['wiki_entities'])
-            max_wiki_entity_jaccard = self._max_jaccard(s_info['wiki_ent_tokens'], t_info['wiki_ent_tokens'])
+            has_same_acronym = self._overlaps(s_info['acronym_frozenset'], t_info['acronym_frozenset']) or \
+                               self._overlaps(s_info['acronym_frozenset'], t_info['alias_frozenset']) or \
+                               self._overlaps(s_info['alias_frozenset'], t_info['acronym_frozenset'])
 
-            has_same_mesh_synonym = self._overlaps(s_ent['mesh_synonyms'], t_ent['mesh_synonyms'])
-            mesh_synonym_jaccard = self._jaccard(s_ent['mesh_synonyms'], t_ent['mesh_synonyms'])
-            max_mesh_synonym_jaccard = self._max_jaccard(s_info['mesh_syn_tokens'], t_info['mesh_syn_tokens'])
+            has_same_wiki_entity = self._overlaps(s_info['wiki_entity_frozenset'], t_info['wiki_entity_frozenset'])
+            max_wiki_entity_jaccard = self._max_jaccard(s_info['wiki_ent_token_sets'], t_info['wiki_ent_token_sets'])
 
-            has_same_dbpedia_synonym = self._overlaps(s_ent['dbpedia_synonyms'], t_ent['dbpedia_synonyms'])
-            dbpedia_synonym_jaccard = self._jaccard(s_ent['dbpedia_synonyms'], t_ent['dbpedia_synonyms'])
-            max_dbpedia_synonym_jaccard = self._max_jaccard(s_info['dbpedia_syn_tokens'], t_info['dbpedia_syn_tokens'])
+            has_same_mesh_synonym = self._overlaps(s_info['mesh_synonym_frozenset'], t_info['mesh_synonym_frozenset'])
+            max_mesh_synonym_jaccard = self._max_jaccard(s_info['mesh_syn_token_sets'], t_info['mesh_syn_token_sets'])
 
-            s_all = s_ent['aliases'] + s_ent['wiki_entities'] + s_ent['mesh_synonyms'] + s_ent['dbpedia_synonyms']
-            t_all = t_ent['aliases'] + t_ent['wiki_entities'] + t_ent['mesh_synonyms'] + t_ent['dbpedia_synonyms']
+            has_same_dbpedia_synonym = self._overlaps(s_info['dbpedia_synonym_frozenset'],
+                                                      t_info['dbpedia_synonym_frozenset'])
+            max_dbpedia_synonym_jaccard = self._max_jaccard(s_info['dbpedia_syn_token_sets'],
+                                                            t_info['dbpedia_syn_token_sets'])
 
-            s_all_tokens = s_info['alias_tokens'] + s_info['wiki_ent_tokens'] + \
-                           s_info['mesh_syn_tokens'] + s_info['dbpedia_syn_tokens']
-            t_all_tokens = t_info['alias_tokens'] + t_info['wiki_ent_tokens'] + \
-                           t_info['mesh_syn_tokens'] + t_info['dbpedia_syn_tokens']
-
-            has_overlapping_synonym = self._overlaps(s_all, t_all)
-            all_synonym_jaccard = self._jaccard(s_all, t_all)
-            max_all_synonym_jaccard = self._max_jaccard(s_all_tokens, t_all_tokens)
+            has_overlapping_synonym = self._overlaps(s_info['all_synonym_frozenset'], t_info['all_synonym_frozenset'])
+            max_all_synonym_jaccard = self._max_jaccard(s_info['all_synonym_token_sets'],
+                                                        t_info['all_synonym_token_sets'])
 
             has_same_root_word = (s_info['parse_root'][0] == t_info['parse_root'][0])
-            root_word_jaccard = self._jaccard(s_info['parse_root'][1], t_info['parse_root'][1])
-
-            # create feature dictionary
-            features = dict()
-
-            features['has_same_canonical_name'] = has_same_canonical_name
-            features['has_same_canonical_name_tokens'] = has_same_canonical_name_tokens
-            features['has_same_canonical_name_token_set'] = has_same_canonical_name_token_set
-            features['has_same_stemmed_name_tokens'] = has_same_stemmed_name_tokens
-            features['has_same_stemmed_name_token_set'] = has_same_stemmed_name_token_set
-
-            features['has_same_lemmatized_name_tokens'] = has_same_lemmatized_name_tokens
-            features['has_same_lemmatized_name_token_set'] = has_same_lemmatized_name_token_set
-            features['name_char_4gram_jaccard'] = name_char_4gram_jaccard
-            features['name_char_5gram_jaccard'] = name_char_5gram_jaccard
-            features['has_alias_in_common'] = has_alias_in_common
-
-            features['has_alias_tokens_in_common'] = has_alias_tokens_in_common
-            features['has_alias_token_set_in_common'] = has_alias_token_set_in_common
-            features['alias_token_jaccard'] = alias_token_jaccard
-            features['max_alias_token_jaccard'] = max_alias_token_jaccard
-            features['max_alias_4gram_jaccard'] = max_alias_4gram_jaccard
-
-            features['max_alias_5gram_jaccard'] = max_alias_5gram_jaccard
-            features['has_same_acronym'] = has_same_acronym
-            features['definition_token_jaccard'] = definition_token_jaccard
-            features['has_same_wiki_entity'] = has_same_wiki_entity
-            features['wiki_entity_jaccard'] = wiki_entity_jaccard
-
-            features['max_wiki_entity_jaccard'] = max_wiki_entity_jaccard
-            features['has_same_mesh_synonym'] = has_same_mesh_synonym
-            features['mesh_synonym_jaccard'] = mesh_synonym_jaccard
-            features['max_mesh_synonym_jaccard'] = max_mesh_synonym_jaccard
-            features['has_same_dbpedia_synonym'] = has_same_dbpedia_synonym
-
-            features['dbpedia_synonym_jaccard'] = dbpedia_synonym_jaccard
-            features['max_dbpedia_synonym_jaccard'] = max_dbpedia_synonym_jaccard
-            features['has_overlapping_synonym'] = has_overlapping_synonym
-            features['all_synonym_jaccard'] = all_synonym_jaccard
-            features['max_all_synonym_jaccard'] = max_all_synonym_jaccard
-
-            features['has_same_root_word'] = has_same_root_word
-            features['root_word_jaccard'] = root_word_jaccard
-
-            return features
+
+            # feature values in FEATURE_NAMES order
+            return (has_same_canonical_name, has_same_canonical_name_tokens, has_same_canonical_name_token_set,
+                    has_same_stemmed_name_tokens, has_same_stemmed_name_token_set,
+                    has_same_lemmatized_name_tokens, has_same_lemmatized_name_token_set, name_char_4gram_jaccard,
+                    name_char_5gram_jaccard, has_alias_in_common, has_alias_tokens_in_common,
+                    has_alias_token_set_in_common, alias_token_jaccard, max_alias_token_jaccard,
+                    max_alias_4gram_jaccard, max_alias_5gram_jaccard, has_same_acronym, definition_token_jaccard,
+                    has_same_wiki_entity, wiki_entity_jaccard, max_wiki_entity_jaccard, has_same_mesh_synonym,
+                    mesh_synonym_jaccard, max_mesh_synonym_jaccard, has_same_dbpedia_synonym,
+                    dbpedia_synonym_jaccard, max_dbpedia_synonym_jaccard, has_overlapping_synonym,
+                    all_synonym_jaccard, max_all_synonym_jaccard, has_same_root_word, root_word_jaccard)
 
         else:
             raise Exception("Input entities invalid...")
@@ -1,14 +1,17 @@
 import os
 import sys
-import csv
 import json
 import tqdm
 import math
 import itertools
+import multiprocessing
 import requests
 import jsonlines
 import numpy as np
+import pandas
 from copy import copy
+from contextlib import closing
+from functools import lru_cache
 from collections import defaultdict
 from lxml import etree
 from django.core.validators import URLValidator
@@ -35,11 +38,64 @@ from allennlp.service.predictors import Predictor
 from torch.cuda import device
 
 
+# state used by align worker processes; inherited on fork so the kbs, candidate
+# lists, and model do not need to be pickled
+_align_state = None
+
+
+def _score_source_entity(s_ent_id, model, s_kb, t_kb, s_candidates, t_ent_ids, feat_gen):
+    """
+    Score the top candidates of a source entity with the model
+    :param s_ent_id: source entity research id
+    :param model: trained model
+    :param s_kb: source kb
+    :param t_kb: target kb
+    :param s_candidates: dict of source entity id to its top target candidate ids
+    :param t_ent_ids: set of target entity ids available for alignment
+    :param feat_gen: feature generator
+    :return: list of (source id, target id, score)
+    """
+    s_ent = s_kb.get_entity_by_research_entity_id(s_ent_id)
+    if s_ent.canonical_name == s_ent_id:
+        return []
+    s_ent_json = s_kb.form_json_entity(s_ent)
+    cand_ids = []
+    pairs = []
+    for t_ent_id in s_candidates[s_ent_id]:
+        if t_ent_id in t_ent_ids:
+            t_ent = t_kb.get_entity_by_research_entity_id(t_ent_id)
+            if t_ent.canonical_name == t_ent_id:
+                continue
+            cand_ids.append(t_ent_id)
+            pairs.append((s_ent_json, t_kb.form_json_entity(t_ent)))
+    if not cand_ids:
+        return []
+    # score all candidates of this source entity with a single model call
+    features = feat_gen.calculate_features_batch(pairs)
+    scores = model.predict_feature_matrix(features, feat_gen.FEATURE_NAMES)[:, 1]
+    return [(s_ent_id, t_ent_id, score) for t_ent_id, score in zip(cand_ids, scores.tolist())]
+
+
+def _score_source_entity_worker(s_ent_id):
+    """
+    Score source entity in a forked worker process using _align_state
+    :param s_ent_id: source entity research id
+    :return:
+    """
+    return _score_source_entity(s_ent_id, *_align_state)
+
+
 # class for training an ontology matcher and aligning input ontologies
 class OntoEmma:
     def __init__(self):
         paths = StandardFilePath()
 
+        # parsed gold alignments keyed by (path, mtime) so modified files are re-read;
+        # only used for evaluation, which loads the same gold files repeatedly
+        self._load_alignment_cached = lru_cache(maxsize=constants.ALIGNMENT_CACHE_SIZE)(
+            self._parse_alignment
+        )
+
     @staticmethod
     def load_kb(kb_path) -> KnowledgeBase:
         """
@@ -76,14 +132,11 @@ class OntoEmma:
             except ValidationError:
                 raise
 
-            response = requests.get(kb_path, stream=True)
-            response.raise_for_status()
-            temp_file = 'temp_file_ontoemma.owl'
-            with open(temp_file, 'wb') as outf:
-                for block in response.iter_content(1024):
-                    outf.write(block)
-            kb = KBLoader.import_owl_kb('', temp_file)
-            os.remove(temp_file)
+            # parse the decoded response body as it streams in, without a temp file
+            with closing(requests.get(kb_path, stream=True)) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                kb = KBLoader.import_owl_kb('', response.raw)
 
         sys.stdout.write("\tEntities: %i\n" % len(kb.entities))
 
@@ -98,12 +151,17 @@ class OntoEmma:
         :param gold_path: path to gold alignment file
         :return:
         """
-        mappings = []
-        for s_ent, t_ent, label, _ in csv.reader(
-            open(gold_path, 'r'), delimiter='\t'
-        ):
-            mappings.append((s_ent, t_ent, float(label)))
-        return mappings
+        # parse with the C engine and only convert the id and label columns; round_trip
+        # parses scores exactly as float() does
+        try:
+            df = pandas.read_csv(
+                gold_path, sep='\t', header=None, usecols=[0, 1, 2],
+                dtype={0: str, 1: str, 2: np.float64},
+                keep_default_na=False, engine='c', float_precision='round_trip'
+            )
+        except pandas.errors.EmptyDataError:
+            return []
+        return list(zip(map(sys.intern, df[0].values), map(sys.intern, df[1].values), df[2].values.tolist()))
 
     @staticmethod
     def _load_alignment_from_json(gold_path):
@@ -121,7 +179,8 @@ class OntoEmma:
                 s_ent = dataline['source_ent']
                 t_ent = dataline['target_ent']
                 label = dataline['label']
-                mappings.append((s_ent['research_entity_id'], t_ent['research_entity_id'], float(label)))
+                mappings.append((sys.intern(s_ent['research_entity_id']), sys.intern(t_ent['research_entity_id']),
+                                 float(label)))
         return mappings
 
     @staticmethod
@@ -133,44 +192,68 @@ class OntoEmma:
         """
         mappings = []
 
-        # parse the file
-        tree = etree.parse(gold_path)
-        root = tree.getroot()
-        ns = root.nsmap
-        ns['alignment'
-           ] = 'http://knowledgeweb.semanticweb.org/heterogeneity/alignment'
-        maps = root.find('alignment:Alignment',
-                         ns).findall('alignment:map', ns)
+        alignment_ns = '{http://knowledgeweb.semanticweb.org/heterogeneity/alignment}'
         resource = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}resource'
-
-        # parse matches
-        for m in maps:
-            cell = m.find('alignment:Cell', ns)
-            ent1 = cell.find('alignment:entity1', ns).get(resource)
-            ent2 = cell.find('alignment:entity2', ns).get(resource)
-            meas = cell.find('alignment:measure', ns).text
+        entity1_tag = alignment_ns + 'entity1'
+        entity2_tag = alignment_ns + 'entity2'
+        measure_tag = alignment_ns + 'measure'
+
+        # stream over matches, freeing each cell once it has been read; xml ids are never
+        # looked up, so skip building the id table
+        for _, cell in etree.iterparse(gold_path, events=('end',), tag=alignment_ns + 'Cell',
+                                       huge_tree=True, collect_ids=False, remove_blank_text=True):
+            ent1 = ent2 = meas = None
+            for child in cell:
+                if child.tag == entity1_tag:
+                    ent1 = child.get(resource)
+                elif child.tag == entity2_tag:
+                    ent2 = child.get(resource)
+                elif child.tag == measure_tag and child.text and child.text.strip():
+                    meas = float(child.text)
+            if ent1 is not None:
+                ent1 = sys.intern(ent1)
+            if ent2 is not None:
+                ent2 = sys.intern(ent2)
             mappings.append((ent1, ent2, meas))
 
+            cell.clear()
+            parent = cell.getparent()
+            if parent is not None:
+                while parent.getprevious() is not None:
+                    del parent.getparent()[0]
+
         return set(mappings)
 
-    def load_alignment(self, gold_path):
+    def load_alignment(self, gold_path, cache=False):
         """
         Load alignments from gold file.
         File format specified by format specified by
         https://docs.google.com/document/d/1VSeMrpnKlQLrJuh9ffkq7u7aWyQuIcUj4E8dUclReXM
         :param gold_path: path to gold alignment file
+        :param cache: keep the parsed alignment in memory for repeat loads of the same file
         :return:
         """
         sys.stdout.write("\tLoading %s\n" % gold_path)
         assert os.path.exists(gold_path)
+        if cache:
+            return self._load_alignment_cached(gold_path, os.path.getmtime(gold_path))
+        return self._parse_alignment(gold_path, None)
+
+    def _parse_alignment(self, gold_path, mtime):
+        """
+        Parse alignments from gold file based on its extension
+        :param gold_path: path to gold alignment file
+        :param mtime: modification time of gold file, only used as part of the cache key
+        :return: tuple of (source id, target id, score)
+        """
         fname, fext = os.path.splitext(gold_path)
         if fext == '.tsv':
-            return self._load_alignment_from_tsv(gold_path)
+            return tuple(self._load_alignment_from_tsv(gold_path))
         elif fext == '.rdf':
-            return self._load_alignment_from_rdf(gold_path)
+            return tuple(self._load_alignment_from_rdf(gold_path))
         else:
             try:
-                return self._load_alignment_from_json(gold_path)
+                return tuple(self._load_alignment_from_json(gold_path))
             except:
                 raise NotImplementedError(
                     "Unknown input alignment file type. Cannot parse."
@@ -215,32 +298,32 @@ class OntoEmma:
 
         sys.stdout.write('Training data size: %i\n' % len(training_labels))
 
-        # generate features for training pairs
+        feature_names = EngineeredFeatureGenerator.FEATURE_NAMES
+
+        # generate features for training pairs into a preallocated matrix
         feat_gen_train = EngineeredFeatureGenerator()
-        training_features = []
-        for s_ent, t_ent in tqdm.tqdm(training_pairs, total=len(training_pairs)):
-            training_features.append(
-                feat_gen_train.calculate_features(s_ent, t_ent)
-            )
+        training_features = np.empty((len(training_pairs), len(feature_names)), dtype=np.float64)
+        feat_gen_train.calculate_features_batch(
+            tqdm.tqdm(training_pairs, total=len(training_pairs)), out=training_features
+        )
 
         sys.stdout.write('Development data size: %i\n' % len(dev_labels))
 
-        # generate features for development pairs
+        # generate features for development pairs into a preallocated matrix
         feat_gen_dev = EngineeredFeatureGenerator()
-        dev_features = []
-        for s_ent, t_ent in tqdm.tqdm(dev_pairs, total=len(dev_pairs)):
-            dev_features.append(
-                feat_gen_dev.calculate_features(s_ent, t_ent)
-            )
+        dev_features = np.empty((len(dev_pairs), len(feature_names)), dtype=np.float64)
+        feat_gen_dev.calculate_features_batch(
+            tqdm.tqdm(dev_pairs, total=len(dev_pairs)), out=dev_features
+        )
 
-        model.train(training_features, training_labels)
+        model.train_feature_matrix(training_features, training_labels, feature_names)
 
-        training_accuracy = model.score_accuracy(training_features, training_labels)
+        training_accuracy = model.score_accuracy_feature_matrix(training_features, training_labels, feature_names)
         sys.stdout.write(
             "Accuracy on training data set: %.2f\n" % training_accuracy
         )
 
-        dev_accuracy = model.score_accuracy(dev_features, dev_labels)
+        dev_accuracy = model.score_accuracy_feature_matrix(dev_features, dev_labels, feature_names)
         sys.stdout.write(
             "Accuracy on development data set: %.2f\n" % dev_accuracy
         )
@@ -432,7 +515,8 @@ class OntoEmma:
 
         sys.stdout.write("Making predictions...\n")
         s_ent_tqdm = tqdm.tqdm(source_kb.entities,
-                               total=len(source_kb.entities))
+                               total=len(source_kb.entities),
+                               mininterval=constants.PROGRESS_MIN_INTERVAL)
         for s_ent in s_ent_tqdm:
             s_ent_id = s_ent.research_entity_id
             for t_ent_id in candidate_selector.select_candidates(
@@ -510,13 +594,15 @@ class OntoEmma:
         :param s_kb:
         :param t_kb:
         :param cand_sel:
-        :return:
+        :return: alignment, remaining source ids, remaining target ids, and dict of each remaining
+            source id to its top KEEP_TOP_K_CANDIDATES target candidates
         """
         alignment = []
         s_aliases = dict()
         t_aliases = dict()
         s_matched = set([])
         t_matched = set([])
+        s_candidates = dict()
         for s_ent in s_kb.entities:
             s_aliases[s_ent.research_entity_id] = set(
                 [a.lower().replace('_', ' ').replace('-', '') for a in s_ent.aliases]
@@ -526,18 +612,23 @@ class OntoEmma:
                 [a.lower().replace('_', ' ').replace('-', '') for a in t_ent.aliases]
             )
 
-        for s_ent in tqdm.tqdm(s_kb.entities, total=len(s_kb.entities)):
+        for s_ent in tqdm.tqdm(s_kb.entities, total=len(s_kb.entities),
+                               mininterval=constants.PROGRESS_MIN_INTERVAL):
             s_id = s_ent.research_entity_id
-            for t_id in cand_sel.select_candidates(s_id):
+            candidates = cand_sel.select_candidates(s_id)
+            for t_id in candidates:
                 if len(s_aliases[s_id].intersection(t_aliases[t_id])) > 0:
                     alignment.append((s_id, t_id, 1.0))
                     s_matched.add(s_id)
                     t_matched.add(t_id)
+            # keep the top candidates so the model pass does not rank them again
+            if s_id not in s_matched:
+                s_candidates[s_id] = candidates[:constants.KEEP_TOP_K_CANDIDATES]
 
         s_remaining = set([e.research_entity_id for e in s_kb.entities]).difference(s_matched)
         t_remaining = set([e.research_entity_id for e in t_kb.entities]).difference(t_matched)
 
-        return alignment, s_remaining, t_remaining
+        return alignment, s_remaining, t_remaining, s_candidates
 
     @staticmethod
     def _apply_best_alignment_strategy(sim_scores):
@@ -646,7 +737,8 @@ class OntoEmma:
 
             # iterate through all alignments
             for (s_ent_id, t_ent_id), score in tqdm.tqdm(updated_neighborhood_sim.items(),
-                                                         total=len(updated_neighborhood_sim)):
+                                                         total=len(updated_neighborhood_sim),
+                                                         mininterval=constants.PROGRESS_MIN_INTERVAL):
                 s_ent = s_kb.get_entity_by_research_entity_id(s_ent_id)
                 t_ent = t_kb.get_entity_by_research_entity_id(t_ent_id)
 
@@ -691,7 +783,7 @@ class OntoEmma:
         """
 
         sys.stdout.write("Finding string equivalences...\n")
-        alignment, s_ent_ids, t_ent_ids = self._align_string_equiv(s_kb, t_kb, cand_sel)
+        alignment, s_ent_ids, t_ent_ids, s_candidates = self._align_string_equiv(s_kb, t_kb, cand_sel)
         sys.stdout.write("%i alignments with string equivalence\n" % len(alignment))
 
         sim_scores = dict()
@@ -702,22 +794,27 @@ class OntoEmma:
 
         sys.stdout.write("Making predictions...\n")
 
-        s_ent_tqdm = tqdm.tqdm(s_ent_ids,
-                               total=len(s_ent_ids))
-
-        for s_ent_id in s_ent_tqdm:
-            s_ent = s_kb.get_entity_by_research_entity_id(s_ent_id)
-            if s_ent.canonical_name == s_ent_id:
-                continue
-            for t_ent_id in cand_sel.select_candidates(s_ent_id)[:constants.KEEP_TOP_K_CANDIDATES]:
-                if t_ent_id in t_ent_ids:
-                    t_ent = t_kb.get_entity_by_research_entity_id(t_ent_id)
-                    if t_ent.canonical_name == t_ent_id:
-                        continue
-                    features = [feat_gen.calculate_features(s_kb.form_json_entity(s_ent),
-                                                            t_kb.form_json_entity(t_ent))]
-                    score = model.predict_entity_pair(features)
-                    sim_scores[(s_ent_id, t_ent_id)] = score[0][1]
+        state = (model, s_kb, t_kb, s_candidates, t_ent_ids, feat_gen)
+        num_workers = os.cpu_count() or 1
+        if len(s_ent_ids) >= constants.PARALLEL_ALIGN_MIN_ENTITIES and num_workers > 1 \
+                and 'fork' in multiprocessing.get_all_start_methods():
+            global _align_state
+            _align_state = state
+            try:
+                # a fork context pool; ProcessPoolExecutor only takes mp_context from python 3.7
+                with multiprocessing.get_context('fork').Pool(processes=num_workers) as pool:
+                    entity_scores = pool.imap(_score_source_entity_worker, s_ent_ids, chunksize=64)
+                    for scores in tqdm.tqdm(entity_scores, total=len(s_ent_ids),
+                                            mininterval=constants.PROGRESS_MIN_INTERVAL):
+                        for s_id, t_id, score in scores:
+                            sim_scores[(s_id, t_id)] = score
+            finally:
+                _align_state = None
+        else:
+            for s_ent_id in tqdm.tqdm(s_ent_ids, total=len(s_ent_ids),
+                                      mininterval=constants.PROGRESS_MIN_INTERVAL):
+                for s_id, t_id, score in _score_source_entity(s_ent_id, *state):
+                    sim_scores[(s_id, t_id)] = score
 
         return sim_scores
 
@@ -747,7 +844,9 @@ class OntoEmma:
         from emma.allennlp_classes.ontoemma_model import OntoEmmaNN
         from emma.allennlp_classes.ontoemma_predictor import OntoEmmaPredictor
 
-        alignment, s_ent_ids, t_ent_ids = self._align_string_equiv(source_kb, target_kb, candidate_selector)
+        alignment, s_ent_ids, t_ent_ids, s_candidates = self._align_string_equiv(
+            source_kb, target_kb, candidate_selector
+        )
         sys.stdout.write("%i alignments with string equivalence\n" % len(alignment))
 
         if cuda_device > 0:
@@ -760,7 +859,8 @@ class OntoEmma:
 
         sys.stdout.write("Making predictions...\n")
         s_ent_tqdm = tqdm.tqdm(s_ent_ids,
-                               total=len(s_ent_ids))
+                               total=len(s_ent_ids),
+                               mininterval=constants.PROGRESS_MIN_INTERVAL)
         sim_scores = dict()
 
         if cuda_device > 0:
@@ -769,7 +869,7 @@ class OntoEmma:
 
                 for s_ent_id in s_ent_tqdm:
                     s_ent = source_kb.get_entity_by_research_entity_id(s_ent_id)
-                    for t_ent_id in candidate_selector.select_candidates(s_ent_id)[:constants.KEEP_TOP_K_CANDIDATES]:
+                    for t_ent_id in s_candidates[s_ent_id]:
                         t_ent = target_kb.get_entity_by_research_entity_id(t_ent_id)
                         json_data = {
                             'source_ent': s_ent.form_json(),
@@ -798,7 +898,7 @@ class OntoEmma:
         else:
             for s_ent_id in s_ent_tqdm:
                 s_ent = source_kb.get_entity_by_research_entity_id(s_ent_id)
-                for t_ent_id in candidate_selector.select_candidates(s_ent_id)[:constants.KEEP_TOP_K_CANDIDATES]:
+                for t_ent_id in s_candidates[s_ent_id]:
                     t_ent = target_kb.get_entity_by_research_entity_id(t_ent_id)
                     json_data = {
                         'source_ent': s_ent.form_json(),
@@ -882,19 +982,17 @@ class OntoEmma:
         :param missed_file: file to write missed data
         :return:
         """
-        gold_positives = set(
-            [
-                (s_ent, t_ent)
-                for s_ent, t_ent, score in self.load_alignment(gold_path)
-                if score is not None and score != '' and float(score) > 0.0
-            ]
+        gold_positives = frozenset(
+            (s_ent, t_ent)
+            for s_ent, t_ent, score in self.load_alignment(gold_path, cache=True)
+            if score is not None and score > 0.0
         )
         sys.stdout.write(
             'Positive alignments in gold standard: %i\n' % len(gold_positives)
         )
 
-        alignment_positives = set(
-            [(s_ent, t_ent) for s_ent, t_ent, score in alignment]
+        alignment_positives = frozenset(
+            (s_ent, t_ent) for s_ent, t_ent, score in alignment
         )
         sys.stdout.write(
             'Positive alignments detected by OntoEmma: %i\n' %
@@ -936,10 +1034,10 @@ class OntoEmma:
         f1_score = 0.0
 
         if len(alignment_positives) > 0:
-            precision = len(alignment_positives.intersection(gold_positives)
-                            ) / len(alignment_positives)
-            recall = len(alignment_positives.intersection(gold_positives)
-                         ) / len(gold_positives)
+            # gold positives not missed are the true positives
+            true_positives = len(gold_positives) - len(missed)
+            precision = true_positives / len(alignment_positives)
+            recall = true_positives / len(gold_positives)
             if precision + recall > 0.0:
                 f1_score = (2 * precision * recall / (precision + recall))
 
@@ -958,13 +1056,18 @@ class OntoEmma:
         :param alignment: alignment to write to file
         :return:
         """
+        alignment = list(alignment)
+        scores = np.fromiter(
+            (pred for _, _, pred in alignment), dtype=np.float64, count=len(alignment)
+        )
+        # stable sort on negated scores keeps ties in input order, like sorted(reverse=True)
+        order = np.argsort(-scores, kind='mergesort')
+        # written unquoted and unescaped, matching what _load_alignment_from_tsv reads back
         with open(output_path, 'w') as outf:
-            for s_ent, t_ent, pred in sorted(
-                alignment, key=lambda x: x[2], reverse=True
-            ):
-                outf.write(
-                    "%s\t%s\t%s\t%s\n" % (s_ent, t_ent, pred, "OntoEmma")
-                )
+            outf.writelines(
+                "%s\t%s\t%s\t%s\n" % (alignment[i][0], alignment[i][1], alignment[i][2], "OntoEmma")
+                for i in order
+            )
         return
 
     @staticmethod
@@ -977,42 +1080,49 @@ class OntoEmma:
         :param t_kb_path: path to target KB
         :return:
         """
-        with open(output_path, 'w') as outf:
-            outf.write("<?xml version='1.0' encoding='utf-8'?>\n")
-            outf.write(
-                "<rdf:RDF xmlns='http://knowledgeweb.semanticweb.org/heterogeneity/alignment'\n"
-            )
-            outf.write(
-                "\t xmlns:rdf='http://www.w3.org/1999/02/22-rdf-syntax-ns#' \n"
-            )
-            outf.write("\t xmlns:xsd='http://www.w3.org/2001/XMLSchema#' \n")
-            outf.write("\t alignmentSource='extracted_from_UMLS'>\n\n")
-            outf.write("<Alignment>\n")
-            outf.write("\t<xml>yes</xml>\n")
-            outf.write("\t<level>0</level>\n")
-            outf.write("\t<type>??</type>\n")
-            outf.write("\t<onto1>" + s_kb_path + "</onto1>\n")
-            outf.write("\t<onto2>" + t_kb_path + "</onto2>\n")
-            outf.write("\t<uri1>" + s_kb_path + "</uri1>\n")
-            outf.write("\t<uri2>" + t_kb_path + "</uri2>\n")
-
-            for s_ent, t_ent, pred in sorted(
-                alignment, key=lambda x: x[2], reverse=True
-            ):
-                outf.write("\t<map>\n")
-                outf.write("\t\t<Cell>\n")
-                outf.write("\t\t\t<entity1 rdf:resource=\"" + s_ent + "\"/>\n")
-                outf.write("\t\t\t<entity2 rdf:resource=\"" + t_ent + "\"/>\n")
-                outf.write(
-                    "\t\t\t<measure rdf:datatype=\"http://www.w3.org/2001/XMLSchema#float\">"
-                    + '{0:.2f}'.format(pred) + "</measure>\n"
-                )
-                outf.write("\t\t\t<relation>=</relation>\n")
-                outf.write("\t\t</Cell>\n")
-                outf.write("\t</map>\n\n")
-
-            outf.write("</Alignment>\n")
-            outf.write("</rdf:RDF>")
+        alignment_ns = 'http://knowledgeweb.semanticweb.org/heterogeneity/alignment'
+        rdf_ns = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#'
+        xsd_ns = 'http://www.w3.org/2001/XMLSchema#'
+        nsmap = {None: alignment_ns, 'rdf': rdf_ns, 'xsd': xsd_ns}
+
+        def tag(name):
+            return '{%s}%s' % (alignment_ns, name)
+
+        resource = '{%s}resource' % rdf_ns
+        measure_attrib = {'{%s}datatype' % rdf_ns: xsd_ns + 'float'}
+
+        # stream elements through libxml2, which also escapes entity uris
+        with etree.xmlfile(output_path, encoding='utf-8') as xf:
+            xf.write_declaration()
+            with xf.element('{%s}RDF' % rdf_ns, nsmap=nsmap,
+                            attrib={'alignmentSource': 'extracted_from_UMLS'}):
+                xf.write('\n')
+                with xf.element(tag('Alignment')):
+                    for name, text in [
+                        ('xml', 'yes'), ('level', '0'), ('type', '??'),
+                        ('onto1', s_kb_path), ('onto2', t_kb_path),
+                        ('uri1', s_kb_path), ('uri2', t_kb_path)
+                    ]:
+                        xf.write('\n\t')
+                        with xf.element(tag(name)):
+                            xf.write(text)
+
+                    for s_ent, t_ent, pred in sorted(
+                        alignment, key=lambda x: x[2], reverse=True
+                    ):
+                        xf.write('\n\t')
+                        with xf.element(tag('map')):
+                            with xf.element(tag('Cell')):
+                                with xf.element(tag('entity1'), attrib={resource: s_ent}):
+                                    pass
+                                with xf.element(tag('entity2'), attrib={resource: t_ent}):
+                                    pass
+                                with xf.element(tag('measure'), attrib=measure_attrib):
+                                    xf.write('{0:.2f}'.format(pred))
+                                with xf.element(tag('relation')):
+                                    xf.write('=')
+                    xf.write('\n')
+                xf.write('\n')
         return
 
     def write_alignment(self, output_path, alignment, s_kb_path, t_kb_path):
@@ -1064,7 +1174,7 @@ class OntoEmma:
             t_kb = self.load_kb(t_kb_path)
 
             sys.stdout.write("Loading gold alignment...\n")
-            gold_alignment = self.load_alignment(gold_path)
+            gold_alignment = self.load_alignment(gold_path, cache=True)
             positive_alignments = [(i[0], i[1]) for i in gold_alignment]
             sys.stdout.write("\tNumber of gold alignments: %i\n" % len(positive_alignments))
 
@@ -1,5 +1,6 @@
 import sys
 import pickle
+import numpy as np
 
 from sklearn.linear_model import LogisticRegression
 from sklearn.feature_extraction import DictVectorizer
@@ -45,6 +46,38 @@ class OntoEmmaLRModel:
         print(self.vectorizer.inverse_transform(self.model.coef_))
         return
 
+    def train_feature_matrix(self, features, labels, feature_names):
+        """
+        Train model on a feature matrix
+        :param features: feature matrix, one row per entity pair
+        :param labels: labels for each entity pair
+        :param feature_names: names of the feature matrix columns
+        :return:
+        """
+        # fit the vectorizer on the feature names so saved models also accept feature dicts
+        self.vectorizer.fit([dict.fromkeys(feature_names, 0.0)])
+        self.model.fit(self._to_model_columns(features, feature_names), labels)
+        print("Feature weights")
+        print(self.vectorizer.inverse_transform(self.model.coef_))
+        return
+
+    def _to_model_columns(self, features, feature_names):
+        """
+        Reorder feature matrix columns to the vectorizer's feature order; unknown features are dropped
+        and features missing from the matrix are zero, as with DictVectorizer.transform
+        :param features: feature matrix
+        :param feature_names: names of the feature matrix columns
+        :return:
+        """
+        if list(feature_names) == self.vectorizer.feature_names_:
+            return features
+        vocabulary = self.vectorizer.vocabulary_
+        vectors = np.zeros((features.shape[0], len(vocabulary)), dtype=features.dtype)
+        for col, name in enumerate(feature_names):
+            if name in vocabulary:
+                vectors[:, vocabulary[name]] = features[:, col]
+        return vectors
+
     def score_accuracy(self, f_dicts, labels):
         """
         Calculate the accuracy score on input labels and features
@@ -64,3 +97,22 @@ class OntoEmmaLRModel:
         """
         f_vector = self.vectorizer.transform(f_dict)
         return self.model.predict_proba(f_vector)
+
+    def score_accuracy_feature_matrix(self, features, labels, feature_names):
+        """
+        Calculate the accuracy score on input labels and feature matrix
+        :param features: feature matrix
+        :param labels:
+        :param feature_names: names of the feature matrix columns
+        :return:
+        """
+        return self.model.score(self._to_model_columns(features, feature_names), labels)
+
+    def predict_feature_matrix(self, features, feature_names):
+        """
+        Make predictions for alignment given a feature matrix
+        :param features: feature matrix, one row per entity pair
+        :param feature_names: names of the feature matrix columns
+        :return:
+        """
+        return self.model.predict_proba(self._to_model_columns(features, feature_names))
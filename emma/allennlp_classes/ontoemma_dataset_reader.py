@@ -1,12 +1,20 @@
 from typing import Dict, List
+import os
 import logging
 import random
 import itertools
+import multiprocessing
+from collections import OrderedDict
 
 from overrides import overrides
-import json
 import tqdm
 
+# orjson parses the jsonl lines considerably faster if available
+try:
+    import orjson as json
+except ImportError:
+    import json
+
 from allennlp.common import Params
 from allennlp.common.checks import ConfigurationError
 from allennlp.common.file_utils import cached_path
@@ -22,10 +30,59 @@ from emma.allennlp_classes.float_field import FloatField
 
 from emma.EngineeredFeatureGenerator import EngineeredFeatureGenerator
 import emma.utils.string_utils as string_utils
+import emma.constants as constants
 
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
+# separator used to tokenize several strings with a single tokenizer call
+TOKEN_SEPARATOR = '\u2063'
+
+# reader and file used by shard worker processes; inherited on fork so the tokenizer,
+# indexers, and feature generator do not need to be pickled
+_shard_reader = None
+_shard_file_path = None
+
+
+def _get_shard_offsets(file_path, num_shards):
+    """
+    Split file into byte ranges of roughly equal size, each starting at the beginning of a line
+    :param file_path:
+    :param num_shards:
+    :return: list of (start, end) byte offsets
+    """
+    size = os.path.getsize(file_path)
+    offsets = [0]
+    with open(file_path, 'rb') as f:
+        for i in range(1, num_shards):
+            f.seek(max(size * i // num_shards, offsets[-1]))
+            # advance to the start of the next line
+            f.readline()
+            offsets.append(min(f.tell(), size))
+    offsets.append(size)
+    return [(start, end) for start, end in zip(offsets[:-1], offsets[1:]) if start < end]
+
+
+def _read_shard(shard):
+    """
+    Read training pairs and their engineered features from the lines starting within byte range
+    shard of the shard file; instances are built by the parent since spacy tokens cannot be pickled
+    :param shard: (start, end) byte offsets
+    :return: list of (s_ent, t_ent, label, feat_dict)
+    """
+    start, end = shard
+    examples = []
+    with open(_shard_file_path, 'rb') as f:
+        f.seek(start)
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            s_ent, t_ent, label = _shard_reader._parse_line(line)
+            feat_dict = _shard_reader.feat_gen.calculate_features(s_ent, t_ent)
+            examples.append((s_ent, t_ent, label, feat_dict))
+    return examples
+
 
 @DatasetReader.register("ontology_matcher")
 class OntologyMatchingDatasetReader(DatasetReader):
@@ -49,11 +106,15 @@ class OntologyMatchingDatasetReader(DatasetReader):
         We use this to define the input representation for the text.  See :class:`TokenIndexer`.
         Note that the `output` tags will always correspond to single token IDs based on how they
         are pre-tokenised in the data file.
+    num_workers : ``int``, optional (default=``1``)
+        If greater than 1, the file is split into this many byte range shards which are read in
+        parallel worker processes.
     """
     def __init__(self,
                  tokenizer: Tokenizer = None,
                  name_token_indexer: Dict[str, TokenIndexer] = None,
-                 token_only_indexer: Dict[str, TokenIndexer] = None) -> None:
+                 token_only_indexer: Dict[str, TokenIndexer] = None,
+                 num_workers: int = 1) -> None:
         self._name_token_indexer = name_token_indexer or \
                                    {'tokens': SingleIdTokenIndexer(namespace="tokens"),
                                     'token_characters': TokenCharactersIndexer(namespace="token_characters")}
@@ -61,10 +122,121 @@ class OntologyMatchingDatasetReader(DatasetReader):
                                    {'tokens': SingleIdTokenIndexer(namespace="tokens")}
         self._tokenizer = tokenizer or WordTokenizer()
 
-        self._empty_token_text_field = TextField(self._tokenizer.tokenize('00000'), self._token_only_indexer)
+        # memoize tokenization in lru order; the same entity names recur across many training pairs
+        self._token_cache = OrderedDict()
+
+        # placeholder token prepended to names, tokenized once
+        self._prefix_tokens = self._tokenizer.tokenize('00000')
+
+        self._empty_token_text_field = TextField(self._prefix_tokens, self._token_only_indexer)
+        self._empty_alias_list_field = ListField(
+            [TextField(self._prefix_tokens + self._prefix_tokens, self._name_token_indexer)]
+        )
 
         self.feat_gen = EngineeredFeatureGenerator()
 
+        self._num_workers = num_workers
+
+    def _tokenize_batch(self, strings):
+        """
+        Return list of tokens for each string in strings; strings not already in the tokenization cache
+        and without leading or trailing whitespace are joined by a separator and tokenized with a single
+        tokenizer call
+        :param strings:
+        :return:
+        """
+        tokens_by_string = dict()
+        missing = []
+        for s in dict.fromkeys(strings):
+            tokens = self._token_cache.get(s)
+            if tokens is None:
+                missing.append(s)
+            else:
+                # mark as recently used
+                self._token_cache.move_to_end(s)
+                tokens_by_string[s] = tokens
+
+        if missing:
+            # empty and whitespace padded strings tokenize differently next to the separator
+            # (e.g. spacy emits whitespace tokens), so only batch strings without outer whitespace
+            batched = [s for s in missing if s and s == s.strip()]
+            batched_tokens = dict()
+            if batched:
+                split_tokens = [[]]
+                for token in self._tokenizer.tokenize((' %s ' % TOKEN_SEPARATOR).join(batched)):
+                    if token.text == TOKEN_SEPARATOR:
+                        split_tokens.append([])
+                    else:
+                        split_tokens[-1].append(token)
+
+                # fall back to tokenizing each string if the tokenizer did not keep the separators intact
+                if len(split_tokens) != len(batched):
+                    split_tokens = [self._tokenizer.tokenize(s) for s in batched]
+                batched_tokens = dict(zip(batched, split_tokens))
+
+            # store tuples so cached tokens are never mutated through a field
+            for s in missing:
+                tokens = batched_tokens.get(s)
+                if tokens is None:
+                    tokens = self._tokenizer.tokenize(s)
+                tokens_by_string[s] = self._token_cache[s] = tuple(tokens)
+
+            # evict least recently used strings
+            while len(self._token_cache) > constants.TOKEN_CACHE_SIZE:
+                self._token_cache.popitem(last=False)
+
+        return [list(tokens_by_string[s]) for s in strings]
+
+    def _tokenize(self, s):
+        """
+        Return list of tokens for string s from the tokenization cache
+        :param s:
+        :return:
+        """
+        return self._tokenize_batch([s])[0]
+
+    @staticmethod
+    def _parse_line(line):
+        """
+        Parse a jsonl line into source entity, target entity and label
+        :param line:
+        :return:
+        """
+        training_pair = json.loads(line)
+        return training_pair['source_ent'], training_pair['target_ent'], training_pair['label']
+
+    def _line_to_instance(self, line):
+        """
+        Convert a jsonl line into an instance
+        :param line:
+        :return:
+        """
+        s_ent, t_ent, label = self._parse_line(line)
+        return self.text_to_instance(s_ent, t_ent, label)
+
+    def _read_parallel(self, file_path):
+        """
+        Read instances from byte range shards of file; features are calculated in parallel worker
+        processes and instances are built here in file order
+        :param file_path:
+        :return:
+        """
+        global _shard_reader, _shard_file_path
+        _shard_reader = self
+        _shard_file_path = file_path
+
+        instances = []
+        shards = _get_shard_offsets(file_path, self._num_workers)
+        try:
+            with multiprocessing.get_context('fork').Pool(processes=self._num_workers) as pool:
+                for shard_examples in tqdm.tqdm(pool.imap(_read_shard, shards), total=len(shards)):
+                    for s_ent, t_ent, label, feat_dict in shard_examples:
+                        instances.append(self.text_to_instance(s_ent, t_ent, label, feat_dict=feat_dict))
+        finally:
+            _shard_reader = None
+            _shard_file_path = None
+        return instances
+
     @overrides
     def read(self, file_path):
         # if `file_path` is a URL, redirect to the cache
@@ -72,32 +244,35 @@ class OntologyMatchingDatasetReader(DatasetReader):
 
         instances = []
 
-        # open data file and read lines
-        with open(file_path, 'r') as ontm_file:
-            logger.info("Reading ontology matching instances from jsonl dataset at: %s", file_path)
-            for line in tqdm.tqdm(ontm_file):
-                training_pair = json.loads(line)
-                s_ent = training_pair['source_ent']
-                t_ent = training_pair['target_ent']
-                label = training_pair['label']
-
-                # convert entry to instance and append to instances
-                instances.append(self.text_to_instance(s_ent, t_ent, label))
+        logger.info("Reading ontology matching instances from jsonl dataset at: %s", file_path)
+        # workers inherit the reader on fork, so read serially where fork is unavailable
+        if self._num_workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            instances = self._read_parallel(file_path)
+        else:
+            # open data file and read lines; progress is tracked in bytes to avoid counting lines
+            with open(file_path, 'rb') as ontm_file, \
+                    tqdm.tqdm(total=os.path.getsize(file_path), unit='B', unit_scale=True) as pbar:
+                for line in ontm_file:
+                    pbar.update(len(line))
+                    # convert entry to instance and append to instances
+                    instances.append(self._line_to_instance(line))
 
         if not instances:
             raise ConfigurationError("No instances were read from the given filepath {}. "
                                      "Is the path correct?".format(file_path))
         return Dataset(instances)
 
-    def _get_features(self, s_ent: dict, t_ent: dict):
+    def _get_features(self, s_ent: dict, t_ent: dict, feat_dict: dict = None):
         """
         Calculate features between two entities s_ent and t_ent from source and target KBs respectively
         :param s_ent: entity from source KB
         :param t_ent: entity from target KB
+        :param feat_dict: precomputed feature dictionary, if available
         :return:
         """
         # get feature dictionary from feature generator
-        feat_dict = self.feat_gen.calculate_features(s_ent, t_ent)
+        if feat_dict is None:
+            feat_dict = self.feat_gen.calculate_features(s_ent, t_ent)
 
         # form feature vector
         feature_vec = [FloatField(float(feat_dict['has_same_canonical_name'])),
@@ -141,57 +316,71 @@ class OntologyMatchingDatasetReader(DatasetReader):
                        ]
         return feature_vec
 
+    @staticmethod
+    def _sample_n(l, n, max_len):
+        """
+        Sample n from list l, keeping only entries with len less than max_len;
+        if n is greater than the length of the filtered list, just return the filtered list (possibly empty)
+        :param l:
+        :param n:
+        :param max_len:
+        :return:
+        """
+        l = [i for i in l if len(i) <= max_len]
+        if len(l) <= n:
+            return l
+        # sample indices rather than copying the candidate list
+        return [l[i] for i in random.sample(range(len(l)), n)]
+
     @overrides
     def text_to_instance(self,  # type: ignore
                          s_ent: dict,
                          t_ent: dict,
-                         label: str = None) -> Instance:
+                         label: str = None,
+                         feat_dict: dict = None) -> Instance:
         # pylint: disable=arguments-differ
 
-        # sample n from list l, keeping only entries with len less than max_len
-        # if n is greater than the length of l, just return l
-        def sample_n(l, n, max_len):
-            l = [i for i in l if len(i) <= max_len]
-            if not l:
-                return ['00000']
-            if len(l) <= n:
-                return l
-            return random.sample(l, n)
-
         fields: Dict[str, Field] = {}
 
         fields['engineered_features'] = ListField(
-            self._get_features(s_ent, t_ent)
+            self._get_features(s_ent, t_ent, feat_dict)
         )
 
-        # add entity name fields
-        fields['s_ent_name'] = TextField(
-            self._tokenizer.tokenize('00000 ' + s_ent['canonical_name']), self._name_token_indexer
-        )
-        fields['t_ent_name'] = TextField(
-            self._tokenizer.tokenize('00000 ' + t_ent['canonical_name']), self._name_token_indexer
-        )
+        s_aliases = self._sample_n(s_ent['aliases'], 16, 128)
+        t_aliases = self._sample_n(t_ent['aliases'], 16, 128)
 
-        s_aliases = sample_n(s_ent['aliases'], 16, 128)
-        t_aliases = sample_n(t_ent['aliases'], 16, 128)
+        s_has_def = len(s_ent['definition']) > 5
+        t_has_def = len(t_ent['definition']) > 5
+
+        # tokenize all text fields of both entities in one tokenizer call
+        names = [s_ent['canonical_name'], t_ent['canonical_name']]
+        definitions = ([s_ent['definition']] if s_has_def else []) + ([t_ent['definition']] if t_has_def else [])
+        all_tokens = self._tokenize_batch(names + s_aliases + t_aliases + definitions)
+
+        s_name_tokens, t_name_tokens = all_tokens[:2]
+        s_alias_tokens = all_tokens[2:2 + len(s_aliases)]
+        t_alias_tokens = all_tokens[2 + len(s_aliases):2 + len(s_aliases) + len(t_aliases)]
+        def_tokens = all_tokens[2 + len(s_aliases) + len(t_aliases):]
+
+        # add entity name fields
+        fields['s_ent_name'] = TextField(self._prefix_tokens + s_name_tokens, self._name_token_indexer)
+        fields['t_ent_name'] = TextField(self._prefix_tokens + t_name_tokens, self._name_token_indexer)
 
         # add entity alias fields
         fields['s_ent_alias'] = ListField(
-            [TextField(self._tokenizer.tokenize('00000 ' + a), self._name_token_indexer)
-             for a in s_aliases]
-        )
+            [TextField(self._prefix_tokens + tokens, self._name_token_indexer) for tokens in s_alias_tokens]
+        ) if s_aliases else self._empty_alias_list_field
         fields['t_ent_alias'] = ListField(
-            [TextField(self._tokenizer.tokenize('00000 ' + a), self._name_token_indexer)
-             for a in t_aliases]
-        )
+            [TextField(self._prefix_tokens + tokens, self._name_token_indexer) for tokens in t_alias_tokens]
+        ) if t_aliases else self._empty_alias_list_field
 
         # add entity definition fields
         fields['s_ent_def'] = TextField(
-            self._tokenizer.tokenize(s_ent['definition']), self._token_only_indexer
-        ) if len(s_ent['definition']) > 5 else self._empty_token_text_field
+            def_tokens.pop(0), self._token_only_indexer
+        ) if s_has_def else self._empty_token_text_field
         fields['t_ent_def'] = TextField(
-            self._tokenizer.tokenize(t_ent['definition']), self._token_only_indexer
-        ) if len(t_ent['definition']) > 5 else self._empty_token_text_field
+            def_tokens.pop(0), self._token_only_indexer
+        ) if t_has_def else self._empty_token_text_field
 
         # add boolean label (0 = no match, 1 = match)
         fields['label'] = BooleanField(label)
@@ -203,7 +392,9 @@ class OntologyMatchingDatasetReader(DatasetReader):
         tokenizer = Tokenizer.from_params(params.pop('tokenizer', {}))
         name_token_indexer = TokenIndexer.dict_from_params(params.pop('name_token_indexer', {}))
         token_only_indexer = TokenIndexer.dict_from_params(params.pop('token_only_indexer', {}))
+        num_workers = params.pop('num_workers', 1)
         params.assert_empty(cls.__name__)
         return OntologyMatchingDatasetReader(tokenizer=tokenizer,
                                              name_token_indexer=name_token_indexer,
-                                             token_only_indexer=token_only_indexer)
+                                             token_only_indexer=token_only_indexer,
+                                             num_workers=num_workers)
@@ -23,6 +23,24 @@ KEEP_TOP_K_CANDIDATES = 100
 # N-gram size for character n-grams
 NGRAM_SIZE = 5
 
+# Max number of strings memoized by token processing caches
+TOKEN_CACHE_SIZE = 200000
+
+# Minimum KB size for tokenizing entities in a process pool
+PARALLEL_TOKENIZE_MIN_ENTITIES = 10000
+
+# Minimum number of source entities for scoring alignments in a process pool
+PARALLEL_ALIGN_MIN_ENTITIES = 1000
+
+# Max number of parsed gold alignment files kept in memory by OntoEmma.load_alignment(cache=True)
+ALIGNMENT_CACHE_SIZE = 8
+
+# Minimum seconds between progress bar refreshes in alignment loops
+PROGRESS_MIN_INTERVAL = 0.5
+
+# Max number of loaded KBs kept in memory while processing KB pairs
+KB_CACHE_SIZE = 4
+
 # IDF limit below which tokens are thrown out
 IDF_LIMIT = np.log(20)
 
@@ -57,10 +75,10 @@ DEVELOPMENT_PART = 0.2
 TEST_PART = 0.2
 
 # relation labels from UMLS
-UMLS_SYNONYM_REL_LABELS = ['RL', 'RQ', 'RU', 'SY']
-UMLS_PARENT_REL_LABELS = ['RB', 'PAR', 'Is a', 'Part of', 'subClassOf', 'is_a', 'part_of']
-UMLS_CHILD_REL_LABELS = ['RN', 'CHD', 'Has part', 'subClass', 'has_part']
-UMLS_SIBLING_REL_LABELS = ['SIB', 'RO']
+UMLS_SYNONYM_REL_LABELS = frozenset({'RL', 'RQ', 'RU', 'SY'})
+UMLS_PARENT_REL_LABELS = frozenset({'RB', 'PAR', 'Is a', 'Part of', 'subClassOf', 'is_a', 'part_of'})
+UMLS_CHILD_REL_LABELS = frozenset({'RN', 'CHD', 'Has part', 'subClass', 'has_part'})
+UMLS_SIBLING_REL_LABELS = frozenset({'SIB', 'RO'})
 
 # symmetric relations
 SYMMETRIC_RELATIONS = {'PAR': 'CHD',
@@ -289,7 +289,7 @@ class KBLoader(object):
         """
         Create a KnowledgeBase object with entities and relations from an OWL file
         :param kb_name:
-        :param kb_filename:
+        :param kb_filename: path to OWL file, or a readable binary file object
         :return:
         """
 
@@ -303,18 +303,15 @@ class KBLoader(object):
                     return descriptions[r_id][0]
             return None
 
-        assert kb_filename.endswith('.owl') or kb_filename.endswith('.rdf')
+        assert hasattr(kb_filename, 'read') or kb_filename.endswith('.owl') or kb_filename.endswith('.rdf')
 
         # initialize the KB
         kb = KnowledgeBase()
         kb.name = kb_name
 
-        # parse the file
-        try:
-            tree = etree.parse(kb_filename)
-        except etree.XMLSyntaxError:
-            p = etree.XMLParser(huge_tree=True)
-            tree = etree.parse(kb_filename, parser=p)
+        # parse the file once with huge tree support; xml ids are never looked up
+        p = etree.XMLParser(huge_tree=True, collect_ids=False)
+        tree = etree.parse(kb_filename, parser=p)
 
         root = tree.getroot()
         ns = root.nsmap
@@ -1,4 +1,5 @@
 import os
+import sys
 import json
 import logging
 import tqdm
@@ -10,6 +11,20 @@ from emma.utils.common import global_tokenizer
 import emma.utils.string_utils as string_utils
 import emma.constants as constants
 
+# entity relation categories and the relation labels belonging to each
+REL_CATEGORIES = {
+    'par_relations': constants.UMLS_PARENT_REL_LABELS,
+    'chd_relations': constants.UMLS_CHILD_REL_LABELS,
+    'sib_relations': constants.UMLS_SIBLING_REL_LABELS,
+    'syn_relations': constants.UMLS_SYNONYM_REL_LABELS
+}
+
+# maps each relation label to its category, for constant time lookup (label sets are disjoint)
+REL_LABEL_TO_CATEGORY = {
+    label: category for category, labels in REL_CATEGORIES.items() for label in labels
+}
+
+
 # a lightweight class to represent an entity with a unified schema.
 class KBEntity(object):
     def __init__(
@@ -221,28 +236,16 @@ class KnowledgeBase(object):
                 string_utils.normalize_string(i) for i in ent.additional_details['dbpedia_synonyms']
             ] if 'dbpedia_synonyms' in ent.additional_details else []
 
-            all_rels = [self.relations[r_id] for r_id in ent.relation_ids]
-            par_ents = [
-                r.entity_ids[1] for r in all_rels
-                if r.relation_type in constants.UMLS_PARENT_REL_LABELS
-            ]
-            chd_ents = [
-                r.entity_ids[1] for r in all_rels
-                if r.relation_type in constants.UMLS_CHILD_REL_LABELS
-            ]
-            sib_ents = [
-                r.entity_ids[1] for r in all_rels
-                if r.relation_type in constants.UMLS_SIBLING_REL_LABELS
-            ]
-            syn_ents = [
-                r.entity_ids[1] for r in all_rels
-                if r.relation_type in constants.UMLS_SYNONYM_REL_LABELS
-            ]
+            # group related entities by relation category in a single pass over the entity's relations
+            related_ents = {category: set() for category in REL_CATEGORIES}
+            for r_id in ent.relation_ids:
+                r = self.relations[r_id]
+                category = REL_LABEL_TO_CATEGORY.get(r.relation_type)
+                if category is not None:
+                    related_ents[category].add(r.entity_ids[1])
 
-            ent.additional_details['par_relations'] = list(set(par_ents))
-            ent.additional_details['chd_relations'] = list(set(chd_ents))
-            ent.additional_details['sib_relations'] = list(set(sib_ents))
-            ent.additional_details['syn_relations'] = list(set(syn_ents))
+            for category, ent_ids in related_ents.items():
+                ent.additional_details[category] = list(ent_ids)
 
         return
 
@@ -574,8 +577,9 @@ class KnowledgeBase(object):
             unified_kb = json.loads(infile.read())
             kb.name = unified_kb['name']
 
-            # load entities
+            # load entities; ids are interned so hashing and comparison in lookups stay cheap
             for e in unified_kb['entities']:
+                e['research_entity_id'] = sys.intern(e['research_entity_id'])
                 ent = KBEntity.form_dict(**e)
                 ent.tokenize_properties()
                 ent.set_source_url()
@@ -586,6 +590,7 @@ class KnowledgeBase(object):
             for r in unified_kb['relations']:
                 rel_id = r['relation_id']
                 del r['relation_id']
+                r['entity_ids'] = [sys.intern(i) for i in r['entity_ids']]
                 rel = KBRelation.form_dict(r)
                 relations[rel_id] = rel
 
@@ -0,0 +1,102 @@
+import numpy as np
+
+# numba is optional; without it the kernels below are plain python functions
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def decorator(fn):
+            return fn
+        return decorator
+
+
+def pack_sorted_sets(sets, token_ids):
+    """
+    Pack list of token sets into a flat array of sorted int token ids and an offsets array,
+    so that set i is data[offsets[i]:offsets[i + 1]]
+    :param sets: list of token sets
+    :param token_ids: dict mapping tokens to int ids; new tokens are added
+    :return: data, offsets
+    """
+    offsets = np.zeros(len(sets) + 1, dtype=np.int64)
+    encoded = []
+    for i, s in enumerate(sets):
+        encoded.append(sorted(token_ids.setdefault(t, len(token_ids)) for t in s))
+        offsets[i + 1] = offsets[i] + len(s)
+    data = np.fromiter((t for ids in encoded for t in ids), dtype=np.int32, count=offsets[-1])
+    return data, offsets
+
+
+@njit(cache=True)
+def sorted_jaccard(a, b):
+    """
+    Return jaccard similarity between two non-empty sorted arrays of unique token ids
+    :param a:
+    :param b:
+    :return:
+    """
+    i = 0
+    j = 0
+    intersection_size = 0
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            intersection_size += 1
+            i += 1
+            j += 1
+        elif a[i] < b[j]:
+            i += 1
+        else:
+            j += 1
+    return intersection_size / (len(a) + len(b) - intersection_size)
+
+
+@njit(cache=True)
+def max_sorted_jaccard(a_data, a_offsets, b_data, b_offsets):
+    """
+    Return max jaccard similarity between the packed sets of a and b; empty sets are skipped
+    :param a_data:
+    :param a_offsets:
+    :param b_data:
+    :param b_offsets:
+    :return:
+    """
+    max_jacc = 0.0
+    for x in range(len(a_offsets) - 1):
+        a = a_data[a_offsets[x]:a_offsets[x + 1]]
+        if len(a) == 0:
+            continue
+        for y in range(len(b_offsets) - 1):
+            b = b_data[b_offsets[y]:b_offsets[y + 1]]
+            if len(b) == 0:
+                continue
+            jacc = sorted_jaccard(a, b)
+            if jacc == 1.0:
+                return 1.0
+            if jacc > max_jacc:
+                max_jacc = jacc
+    return max_jacc
+
+
+@njit(cache=True)
+def paired_sorted_jaccard(a_data, a_offsets, b_data, b_offsets):
+    """
+    Return jaccard similarity between the i-th packed sets of a and b for each i; -1 if either set is empty
+    :param a_data:
+    :param a_offsets:
+    :param b_data:
+    :param b_offsets:
+    :return:
+    """
+    n = len(a_offsets) - 1
+    out = np.empty(n, dtype=np.float64)
+    for x in range(n):
+        a = a_data[a_offsets[x]:a_offsets[x + 1]]
+        b = b_data[b_offsets[x]:b_offsets[x + 1]]
+        if len(a) == 0 or len(b) == 0:
+            out[x] = -1.0
+        else:
+            out[x] = sorted_jaccard(a, b)
+    return out
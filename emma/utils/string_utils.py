@@ -1,7 +1,11 @@
 import re
+import itertools
+from functools import lru_cache
 import numpy as np
 from sklearn.metrics import pairwise_distances
 
+import emma.constants as constants
+
 
 CLEANER_RE = re.compile(r'[^a-zA-Z0-9 ]+')
 
@@ -35,6 +39,19 @@ def get_character_n_grams(s, n):
     return zip(*[s_padded[i:] for i in range(n)])
 
 
+@lru_cache(maxsize=constants.TOKEN_CACHE_SIZE)
+def get_character_n_gram_strings(s, n):
+    """
+    Return padded character n-grams from string as a tuple of substrings;
+    equivalent to joining each n-gram from get_character_n_grams, without building per-character tuples
+    :param s: input string
+    :param n: length of n-grams
+    :return:
+    """
+    s_padded = '\0' * (n - 1) + s + '\0' * (n - 1)
+    return tuple(s_padded[i:i + n] for i in range(len(s_padded) - n + 1))
+
+
 def get_tfidf_distance(ind1, ind2, scores):
     """
     # Compute vector distance between two tfidf score vectors
@@ -57,12 +74,24 @@ def get_jaccard_similarity(token_set1, token_set2):
     :return:
     """
     if token_set1 and token_set2:
-        return len(token_set1.intersection(token_set2)
-                  ) / len(token_set1.union(token_set2))
+        intersection_size = len(token_set1 & token_set2)
+        return intersection_size / (len(token_set1) + len(token_set2) - intersection_size)
     else:
         return -1.0
 
 
+def get_token_signature(tokens):
+    """
+    Return 64-bit bloom signature of tokens; sets of tokens with disjoint signatures share no tokens
+    :param tokens:
+    :return:
+    """
+    signature = 0
+    for t in tokens:
+        signature |= 1 << (hash(t) & 63)
+    return signature
+
+
 def get_longest_common_substring_length(s1, s2):
     """
     Return longest common substring found in s1 and s2
@@ -101,8 +130,7 @@ def tokenize_string(s, tokenizer, stop):
     :param stop: set of stop words
     :return:
     """
-    remove_stop = [t for t in tokenizer.tokenize(s) if t not in stop]
-    return tuple(remove_stop)
+    return tuple(itertools.filterfalse(stop.__contains__, tokenizer.tokenize(s)))
 
 def remove_stop(s, tokenizer, stop):
     """
@@ -112,5 +140,4 @@ def remove_stop(s, tokenizer, stop):
     :param stop: set of stop words
     :return:
     """
-    tokens = [t for t in tokenizer.tokenize(s) if t not in stop]
-    return ' '.join(tokens)
+    return ' '.join(itertools.filterfalse(stop.__contains__, tokenizer.tokenize(s)))
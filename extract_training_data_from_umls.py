@@ -4,6 +4,7 @@ import itertools
 import random
 import glob
 import pickle
+from functools import lru_cache
 from collections import defaultdict
 from sklearn.model_selection import train_test_split
 
@@ -152,14 +153,15 @@ class UMLSExtractor(App):
         # all mappings from UMLS
         mappings = defaultdict(list)
 
+        training_kbs = frozenset(constants.TRAINING_KBS)
+
         for cui, entries in concepts.items():
-            # keep only cross-db mappings
+            # keep only cross-db mappings; filter kbs once per entry rather than once per pair
             cui_str = '{}:{}'.format(self.umls_header, cui)
-            uids = set([tuple(i[:2]) for i in entries])
+            uids = set([tuple(i[:2]) for i in entries if i[0] in training_kbs])
             pairs = [
                 sorted([p, q]) for p, q in itertools.combinations(uids, 2)
-                if (p[0] in constants.TRAINING_KBS) and
-                (q[0] in constants.TRAINING_KBS) and (p[0] != q[0])
+                if p[0] != q[0]
             ]
             for p, q in pairs:
                 p_id = '{}:{}'.format(p[0], p[1])
@@ -454,7 +456,7 @@ class UMLSExtractor(App):
         Process and split data into training development and test sets
         :return:
         """
-        all_kb_names = constants.TRAINING_KBS + constants.DEVELOPMENT_KBS
+        all_kb_names = frozenset(constants.TRAINING_KBS + constants.DEVELOPMENT_KBS)
         training_file_dir = os.path.join(self.OUTPUT_DIR, 'training')
 
         output_training_data = os.path.join(self.TRAINING_DIR, 'ontoemma.context.train')
@@ -462,7 +464,8 @@ class UMLSExtractor(App):
         output_test_data = os.path.join(self.TRAINING_DIR, 'ontoemma.context.test')
 
         context_files = glob.glob(os.path.join(self.OUTPUT_KB_DIR, '*context.json'))
-        context_kbs = [os.path.basename(f).split('-')[1] for f in context_files]
+        context_kbs = frozenset(os.path.basename(f).split('-')[1] for f in context_files)
+        usable_kb_names = all_kb_names & context_kbs
         training_files = glob.glob(os.path.join(training_file_dir, '*.tsv'))
         file_names = [os.path.splitext(os.path.basename(f))[0] for f in training_files]
 
@@ -471,17 +474,20 @@ class UMLSExtractor(App):
 
         emma = OntoEmma()
 
-        for fname, fpath in zip(file_names, training_files):
+        # kbs are shared between pairs, so keep recently loaded ones around
+        @lru_cache(maxsize=constants.KB_CACHE_SIZE)
+        def load_context_kb(kb_name):
+            return emma.load_kb(
+                os.path.join(self.OUTPUT_KB_DIR, 'kb-{}-context.json'.format(kb_name))
+            )
+
+        # process pairs sorted by name so pairs sharing a source kb are adjacent
+        for fname, fpath in sorted(zip(file_names, training_files)):
             (kb1_name, kb2_name) = fname.split('-')
-            if kb1_name in all_kb_names and kb2_name in all_kb_names \
-                    and kb1_name in context_kbs and kb2_name in context_kbs:
+            if kb1_name in usable_kb_names and kb2_name in usable_kb_names:
                 sys.stdout.write("Processing %s and %s\n" % (kb1_name, kb2_name))
-                kb1 = emma.load_kb(
-                    os.path.join(self.OUTPUT_KB_DIR, 'kb-{}-context.json'.format(kb1_name))
-                )
-                kb2 = emma.load_kb(
-                    os.path.join(self.OUTPUT_KB_DIR, 'kb-{}-context.json'.format(kb2_name))
-                )
+                kb1 = load_context_kb(kb1_name)
+                kb2 = load_context_kb(kb2_name)
                 alignment = emma.load_alignment(fpath)
 
                 for (e1, e2, score) in alignment:
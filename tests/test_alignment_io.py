@@ -0,0 +1,83 @@
+from emma.OntoEmma import OntoEmma
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+RDF_ALIGNMENT = """<?xml version="1.0" encoding="utf-8"?>
+<rdf:RDF xmlns="http://knowledgeweb.semanticweb.org/heterogeneity/alignment"
+         xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:xsd="http://www.w3.org/2001/XMLSchema#">
+<Alignment>
+  <xml>yes</xml>
+  <level>0</level>
+  <type>??</type>
+  <map>
+    <Cell>
+      <entity1 rdf:resource="http://purl.org/obo/owl/HP#HP_0001621"/>
+      <entity2 rdf:resource="http://purl.org/obo/owl/MESH#D014832"/>
+      <measure rdf:datatype="http://www.w3.org/2001/XMLSchema#float"> 0.75 </measure>
+      <relation>=</relation>
+    </Cell>
+  </map>
+  <map>
+    <Cell>
+      <entity1 rdf:resource="http://purl.org/obo/owl/HP#HP_0001620"/>
+      <entity2 rdf:resource="http://purl.org/obo/owl/MESH#D006685"/>
+      <measure rdf:datatype="http://www.w3.org/2001/XMLSchema#float">1.0</measure>
+      <relation>=</relation>
+    </Cell>
+  </map>
+  <map>
+    <Cell>
+      <entity1 rdf:resource="http://purl.org/obo/owl/HP#HP_0000001"/>
+      <entity2 rdf:resource="http://purl.org/obo/owl/MESH#D000001"/>
+      <relation>=</relation>
+    </Cell>
+  </map>
+</Alignment>
+</rdf:RDF>
+"""
+
+
+class TestAlignmentIO(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_load_alignment_from_rdf(self):
+        rdf_path = os.path.join(self.tmp_dir, 'alignment.rdf')
+        with open(rdf_path, 'w') as f:
+            f.write(RDF_ALIGNMENT)
+        assert OntoEmma._load_alignment_from_rdf(rdf_path) == {
+            ('http://purl.org/obo/owl/HP#HP_0001621', 'http://purl.org/obo/owl/MESH#D014832', 0.75),
+            ('http://purl.org/obo/owl/HP#HP_0001620', 'http://purl.org/obo/owl/MESH#D006685', 1.0),
+            ('http://purl.org/obo/owl/HP#HP_0000001', 'http://purl.org/obo/owl/MESH#D000001', None)
+        }
+
+    def test_rdf_write_round_trip(self):
+        rdf_path = os.path.join(self.tmp_dir, 'alignment.rdf')
+        alignment = [
+            ('http://purl.org/obo/owl/HP#HP_0001621', 'http://purl.org/obo/owl/MESH#D014832', 0.754),
+            ('UMLS:C0001&<a>', 'MSH:"D006685"', 1.0),
+            ('HP:0000001', 'MSH:D000001', 0.5)
+        ]
+        OntoEmma._write_alignment_to_rdf(rdf_path, alignment, 'source & kb.owl', 'target_kb.owl')
+        assert OntoEmma._load_alignment_from_rdf(rdf_path) == {
+            ('http://purl.org/obo/owl/HP#HP_0001621', 'http://purl.org/obo/owl/MESH#D014832', 0.75),
+            ('UMLS:C0001&<a>', 'MSH:"D006685"', 1.0),
+            ('HP:0000001', 'MSH:D000001', 0.5)
+        }
+
+    def test_tsv_scores_round_trip(self):
+        tsv_path = os.path.join(self.tmp_dir, 'alignment.tsv')
+        rand = random.Random(0)
+        alignment = [('s%i' % i, 't%i' % i, rand.random()) for i in range(2000)]
+        OntoEmma._write_alignment_to_tsv(tsv_path, alignment)
+        with open(tsv_path, 'r') as f:
+            expected = [(s_ent, t_ent, float(score)) for s_ent, t_ent, score, _ in (l.split('\t') for l in f)]
+        assert OntoEmma._load_alignment_from_tsv(tsv_path) == expected
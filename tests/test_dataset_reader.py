@@ -0,0 +1,94 @@
+from emma.allennlp_classes.ontoemma_dataset_reader import OntologyMatchingDatasetReader, _get_shard_offsets
+from allennlp.data.tokenizers import Token
+import emma.constants as constants
+import os
+import random
+import unittest
+from unittest import mock
+
+TEST_DATA = os.path.join('tests', 'data')
+
+
+class WhitespaceTokenizer:
+    def tokenize(self, text):
+        return [Token(t) for t in text.split()]
+
+
+class AlphanumericTokenizer:
+    # drops the separator, forcing the per-string fallback
+    def tokenize(self, text):
+        return [Token(t) for t in text.split() if t.isalnum()]
+
+
+class TestDatasetReaderTokenization(unittest.TestCase):
+
+    def test_batch_matches_single_tokenization(self):
+        reader = OntologyMatchingDatasetReader(tokenizer=WhitespaceTokenizer())
+        strings = ['heart attack', 'heart', '', 'myocardial infarction', 'heart']
+        batch_tokens = reader._tokenize_batch(strings)
+        assert [[t.text for t in tokens] for tokens in batch_tokens] == [s.split() for s in strings]
+
+    def test_batch_matches_word_tokenizer(self):
+        # default spacy word tokenizer; empty and whitespace padded strings must not pick up
+        # whitespace tokens from the separator
+        reader = OntologyMatchingDatasetReader()
+        strings = ['heart attack', '', 'weak voice ', ' leading', 'a  b', 'cardiac (heart) arrest.', '\t',
+                   'Weak artificial intelligence (weak AI), also known as narrow AI.']
+        batch_tokens = reader._tokenize_batch(strings)
+        assert [[t.text for t in tokens] for tokens in batch_tokens] == \
+               [[t.text for t in reader._tokenizer.tokenize(s)] for s in strings]
+
+    def test_fallback_when_separator_dropped(self):
+        reader = OntologyMatchingDatasetReader(tokenizer=AlphanumericTokenizer())
+        strings = ['weak voice', 'hoarse', 'vocal cord']
+        batch_tokens = reader._tokenize_batch(strings)
+        assert [[t.text for t in tokens] for tokens in batch_tokens] == [s.split() for s in strings]
+
+    def test_cache_overflow(self):
+        reader = OntologyMatchingDatasetReader(tokenizer=WhitespaceTokenizer())
+        with mock.patch.object(constants, 'TOKEN_CACHE_SIZE', 4):
+            reader._tokenize_batch(['a b', 'c', 'd'])
+            batch_tokens = reader._tokenize_batch(['a b', 'e', 'f', 'g'])
+        assert [[t.text for t in tokens] for tokens in batch_tokens] == [['a', 'b'], ['e'], ['f'], ['g']]
+        # least recently used strings are evicted first
+        assert list(reader._token_cache) == ['a b', 'e', 'f', 'g']
+
+
+class TestDatasetReaderShards(unittest.TestCase):
+    data_path = os.path.join(TEST_DATA, 'test.ontoemma.micro.train')
+
+    def test_shard_offsets_cover_file(self):
+        size = os.path.getsize(self.data_path)
+        for num_shards in [1, 2, 3, 7, 200]:
+            shards = _get_shard_offsets(self.data_path, num_shards)
+            assert shards[0][0] == 0
+            assert shards[-1][1] == size
+            assert all(end == start for (_, end), (start, _) in zip(shards[:-1], shards[1:]))
+            assert len(shards) <= num_shards
+
+    def test_shard_offsets_at_line_starts(self):
+        with open(self.data_path, 'rb') as f:
+            data = f.read()
+        for start, end in _get_shard_offsets(self.data_path, 3):
+            assert start == 0 or data[start - 1:start] == b'\n'
+            assert data[start:end].count(b'\n') > 0
+
+    @staticmethod
+    def _instance_summary(instance):
+        return (
+            [t.text for t in instance.fields['s_ent_name'].tokens],
+            [t.text for t in instance.fields['t_ent_name'].tokens],
+            [[t.text for t in f.tokens] for f in instance.fields['s_ent_alias'].field_list],
+            [t.text for t in instance.fields['t_ent_def'].tokens],
+            [f.value for f in instance.fields['engineered_features'].field_list],
+            instance.fields['label'].label
+        )
+
+    def test_parallel_read_matches_serial(self):
+        random.seed(0)
+        serial = OntologyMatchingDatasetReader(num_workers=1).read(self.data_path)
+        random.seed(0)
+        parallel = OntologyMatchingDatasetReader(num_workers=2).read(self.data_path)
+        assert len(parallel.instances) == len(serial.instances) == 100
+        assert [self._instance_summary(i) for i in parallel.instances] == \
+               [self._instance_summary(i) for i in serial.instances]
@@ -0,0 +1,44 @@
+from emma.EngineeredFeatureGenerator import EngineeredFeatureGenerator
+import emma.utils.numba_utils as numba_utils
+from nltk.stem.snowball import SnowballStemmer
+import json
+import os
+import unittest
+from unittest import mock
+
+TEST_DATA = os.path.join('tests', 'data')
+
+
+def load_training_pairs(n):
+    with open(os.path.join(TEST_DATA, 'test.ontoemma.micro.train'), 'r') as f:
+        pairs = [json.loads(line) for line in f]
+    return [(p['source_ent'], p['target_ent']) for p in pairs[:n]]
+
+
+class TestEngineeredFeatureGenerator(unittest.TestCase):
+
+    feat_gen = EngineeredFeatureGenerator()
+
+    def test_stemming_matches_nltk(self):
+        nltk_stemmer = SnowballStemmer("english")
+        tokens = ['Running', 'HEARTS', 'Abnormalities', 'voice', 'Cardiomyopathy', 'DNA', 'Ligaments']
+        assert [self.feat_gen._stem_interned(t) for t in tokens] == [nltk_stemmer.stem(t) for t in tokens]
+
+    @unittest.skipUnless(numba_utils.HAS_NUMBA, "numba is not installed")
+    def test_numba_features_match_frozensets(self):
+        pairs = load_training_pairs(20)
+        self.feat_gen.token_dict = dict()
+        numba_features = [self.feat_gen.calculate_features(s_ent, t_ent) for s_ent, t_ent in pairs]
+        with mock.patch.object(numba_utils, 'HAS_NUMBA', False):
+            self.feat_gen.token_dict = dict()
+            set_features = [self.feat_gen.calculate_features(s_ent, t_ent) for s_ent, t_ent in pairs]
+        self.feat_gen.token_dict = dict()
+        assert numba_features == set_features
+
+    def test_feature_matrix_matches_feature_dicts(self):
+        pairs = load_training_pairs(20)
+        feature_matrix = self.feat_gen.calculate_features_batch(pairs)
+        assert feature_matrix.shape == (len(pairs), len(EngineeredFeatureGenerator.FEATURE_NAMES))
+        for row, (s_ent, t_ent) in zip(feature_matrix.tolist(), pairs):
+            feat_dict = self.feat_gen.calculate_features(s_ent, t_ent)
+            assert row == [float(feat_dict[name]) for name in EngineeredFeatureGenerator.FEATURE_NAMES]
@@ -0,0 +1,50 @@
+from emma.OntoEmmaLRModel import OntoEmmaLRModel
+import numpy as np
+import unittest
+
+
+RAND = np.random.RandomState(0)
+FEATURE_NAMES = ['has_same_canonical_name', 'name_char_4gram_jaccard', 'alias_token_jaccard', 'root_word_jaccard']
+FEATURES = RAND.rand(60, len(FEATURE_NAMES))
+LABELS = (FEATURES[:, 0] + FEATURES[:, 1] > 1.0).astype(int)
+F_DICTS = [dict(zip(FEATURE_NAMES, row)) for row in FEATURES.tolist()]
+
+# same features with the matrix columns reversed
+REORDERED_NAMES = FEATURE_NAMES[::-1]
+REORDERED_FEATURES = FEATURES[:, ::-1]
+
+
+class TestOntoEmmaLRModelFeatureMatrix(unittest.TestCase):
+
+    def test_train_feature_matrix_matches_dicts(self):
+        dict_model = OntoEmmaLRModel()
+        dict_model.train(F_DICTS, LABELS)
+        matrix_model = OntoEmmaLRModel()
+        matrix_model.train_feature_matrix(REORDERED_FEATURES, LABELS, REORDERED_NAMES)
+
+        assert matrix_model.vectorizer.feature_names_ == dict_model.vectorizer.feature_names_
+        assert np.allclose(matrix_model.model.coef_, dict_model.model.coef_)
+        assert np.allclose(
+            matrix_model.predict_feature_matrix(REORDERED_FEATURES, REORDERED_NAMES),
+            dict_model.predict_entity_pair(F_DICTS)
+        )
+        assert matrix_model.score_accuracy_feature_matrix(REORDERED_FEATURES, LABELS, REORDERED_NAMES) \
+            == dict_model.score_accuracy(F_DICTS, LABELS)
+
+    def test_to_model_columns_matches_vectorizer(self):
+        model = OntoEmmaLRModel()
+        model.train(F_DICTS, LABELS)
+
+        # columns are reordered to the vectorizer's order
+        assert np.array_equal(
+            model._to_model_columns(REORDERED_FEATURES, REORDERED_NAMES),
+            model.vectorizer.transform(F_DICTS)
+        )
+
+        # unknown features are dropped and missing features are zero, as in DictVectorizer.transform
+        names = ['unknown_feature', 'alias_token_jaccard', 'has_same_canonical_name']
+        features = RAND.rand(5, len(names))
+        assert np.array_equal(
+            model._to_model_columns(features, names),
+            model.vectorizer.transform([dict(zip(names, row)) for row in features.tolist()])
+        )
@@ -0,0 +1,53 @@
+import emma.utils.numba_utils as numba_utils
+import emma.utils.string_utils as string_utils
+import itertools
+import random
+import unittest
+
+VOCAB = ['heart', 'attack', 'myocardial', 'infarction', 'weak', 'voice', 'cry', 'abnormal', 'cardiac']
+
+
+def random_sets(n, seed):
+    rand = random.Random(seed)
+    return [frozenset(rand.sample(VOCAB, rand.randint(0, 5))) for _ in range(n)]
+
+
+class TestNumbaUtils(unittest.TestCase):
+
+    a_sets = random_sets(20, 0)
+    b_sets = random_sets(20, 1)
+
+    def test_pack_sorted_sets(self):
+        token_ids = dict()
+        data, offsets = numba_utils.pack_sorted_sets(self.a_sets, token_ids)
+        assert len(offsets) == len(self.a_sets) + 1
+        ids_to_tokens = {v: k for k, v in token_ids.items()}
+        for i, s in enumerate(self.a_sets):
+            ids = data[offsets[i]:offsets[i + 1]].tolist()
+            assert ids == sorted(ids)
+            assert frozenset(ids_to_tokens[t] for t in ids) == s
+
+    def test_paired_jaccard_matches_frozensets(self):
+        token_ids = dict()
+        a_data, a_offsets = numba_utils.pack_sorted_sets(self.a_sets, token_ids)
+        b_data, b_offsets = numba_utils.pack_sorted_sets(self.b_sets, token_ids)
+        jaccards = numba_utils.paired_sorted_jaccard(a_data, a_offsets, b_data, b_offsets).tolist()
+        assert jaccards == [string_utils.get_jaccard_similarity(a, b) for a, b in zip(self.a_sets, self.b_sets)]
+
+    def test_max_jaccard_matches_frozensets(self):
+        token_ids = dict()
+        for n in [0, 1, 5, 20]:
+            a_data, a_offsets = numba_utils.pack_sorted_sets(self.a_sets[:n], token_ids)
+            b_data, b_offsets = numba_utils.pack_sorted_sets(self.b_sets, token_ids)
+            expected = max(
+                [string_utils.get_jaccard_similarity(a, b)
+                 for a, b in itertools.product(self.a_sets[:n], self.b_sets) if a and b] + [0.0]
+            )
+            assert numba_utils.max_sorted_jaccard(a_data, a_offsets, b_data, b_offsets) == expected
+
+    def test_max_jaccard_identical_sets(self):
+        token_ids = dict()
+        a_data, a_offsets = numba_utils.pack_sorted_sets([frozenset(['heart', 'attack'])], token_ids)
+        b_data, b_offsets = numba_utils.pack_sorted_sets([frozenset(['weak']), frozenset(['attack', 'heart'])],
+                                                         token_ids)
+        assert numba_utils.max_sorted_jaccard(a_data, a_offsets, b_data, b_offsets) == 1.0